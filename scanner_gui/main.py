@@ -32,9 +32,79 @@ from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolb
 from matplotlib.figure import Figure
 from mpl_toolkits.mplot3d import Axes3D
 from mpl_toolkits.mplot3d.art3d import Poly3DCollection
+from matplotlib.colors import to_rgba
+from matplotlib import colormaps
 import time
 import os
+import traceback
 from datetime import datetime  # Added for .k file export
+import re
+import selectors
+from collections import deque
+from stl_format import STL_FACET
+
+# GRBL status report: <State,MPos:X,Y[,Z]...> (0.9j) or <State|MPos:X,Y[,Z]|...> (1.1)
+_RE_GRBL_STATUS = re.compile(
+    r'<([^,|>]+)[,|]MPos:(-?\d+(?:\.\d+)?),(-?\d+(?:\.\d+)?)(?:,(-?\d+(?:\.\d+)?))?')
+
+# Distance reply: VL53L1_DISTANCE:138 / VL53L0X_DISTANCE:138 (older firmware: DISTANCE:138)
+_RE_VL53_DISTANCE = re.compile(r'(?:VL53L1_|VL53L0X_)?DISTANCE:\s*(\d+(?:\.\d+)?)')
+# Fallback for free-form replies: a number with a unit, e.g. "138 mm" or "13.8cm"
+_RE_DISTANCE_UNIT = re.compile(r'(\d+\.?\d*)\s*(mm|cm)', re.IGNORECASE)
+
+# Fixed commands are kept as bytes so the hot paths (5Hz status poll, per-point sensor
+# read) write them without formatting or encoding a new string each time
+_CMD_STATUS = b"?\n"
+_CMD_STOP = b"STOP\n"
+_CMD_RESET = b"\x18\n"  # Ctrl-X: GRBL soft reset
+_CMD_UNLOCK = b"$X\n"
+_CMD_HOME = b"G28\n"
+_CMD_READ_VL53 = {"VL53L1": b"READ_VL53L1\n", "VL53L0X": b"READ_VL53L0X\n"}
+
+# GRBL reports MPos to 0.001mm and angle = X × 100, so measured angles lie on a 0.1° grid;
+# cos/sin of every grid angle are computed once and looked up per point
+_ANGLE_GRID = 3600
+_COS_TABLE = np.cos(np.radians(np.arange(_ANGLE_GRID) * 0.1)).astype(np.float32)
+_SIN_TABLE = np.sin(np.radians(np.arange(_ANGLE_GRID) * 0.1)).astype(np.float32)
+
+# Most points drawn in the live 3D preview (exports always use every point)
+PREVIEW_MAX_POINTS = 20000
+# The preview draws one point per cube of this edge length (mm)
+PREVIEW_VOXEL_MM = 2.0
+
+def _fmt(value, ndigits):
+    """Format a number rounded to ndigits decimals, without trailing zeros"""
+    value = round(float(value), ndigits)
+    return str(int(value)) if value.is_integer() else str(value)
+
+def _write_rows(f, rows, fmt, chunk=4096):
+    """Write each row of a 2-D array as one fmt line, formatting a whole chunk of rows
+    with a single % operation and write call"""
+    line = fmt + "\n"
+    for start in range(0, len(rows), chunk):
+        block = rows[start:start + chunk]
+        f.write((line * len(block)) % tuple(block.ravel().tolist()))
+
+def _closest_angle(angles1, angles2):
+    """For each angle in angles1, the index into angles2 (sorted, degrees in [0, 360)) of
+    the closest angle around the circle, and that angular distance
+
+    The closest angle is always one of the two circular neighbours of the insertion
+    point, so a binary search replaces comparing every pair. Ties go to the lower
+    index, the first occurrence of repeated angles.
+    """
+    n = len(angles2)
+    right = np.searchsorted(angles2, angles1)
+    left = np.searchsorted(angles2, angles2[right - 1])  # wraps to the last angle at 0
+    right %= n
+
+    def circular_diff(j):
+        diff = np.abs(angles2[j] - angles1)
+        return np.where(diff > 180, 360 - diff, diff)
+
+    diff_left, diff_right = circular_diff(left), circular_diff(right)
+    use_right = (diff_right < diff_left) | ((diff_right == diff_left) & (right < left))
+    return np.where(use_right, right, left), np.where(use_right, diff_right, diff_left)
 
 class ScannerGUI:
     def __init__(self, root):
@@ -46,7 +116,13 @@ class ScannerGUI:
         self.serial_conn = None
         self.is_connected = False
         self.is_scanning = False
-        self.scan_data = []
+        # Scan points as float32 rows of (x, y, z, angle, height), grown by doubling
+        self._scan_buf = np.empty((4096, 5), dtype=np.float32)
+        self._scan_n = 0
+        self._scan_geometry = None  # (center distance, disk radius) in cm, parsed when a scan starts
+        # Raw (angle, distance, height) samples of the current revolution, same growth scheme
+        self._rev_buf = np.empty((512, 3), dtype=np.float32)
+        self._rev_n = 0
         self.current_layer = 0
         self.current_step = 0
         self.current_angle = 0.0  # Current rotation angle in degrees
@@ -65,10 +141,43 @@ class ScannerGUI:
         self.current_y_pos = 0.0  # Height position in mm (from GRBL Y × 10, actual measurement)
         self.current_z_pos = 0.0  # GRBL Z position in mm (unused)
         self.grbl_state = "Idle"  # GRBL state
+        self._last_parse_error_time = 0.0  # Last time a status parse error was logged
+        self._last_logged_z = None  # Last Z height written to the info log
+        self._last_pos_key = None  # (angle, height) currently shown in the position display
+        self._last_bar = None  # (width, color) currently drawn on the distance bar
+        self.log_jog_commands = False  # Echo jog G-code to the info log (the serial log already shows it)
+        self.trace_status_parse = False  # Print every parsed status report to the console (debugging)
+        self.trace_serial = False  # Print every sent command and received line to the console (debugging)
+        self._rx_queue = deque()  # Replies from the reader thread other than status reports (never dropped)
+        self._rx_status = deque(maxlen=1)  # Newest status report from the reader thread; older ones are dropped
+        self._rx_drain_job = None  # Pending root.after id for _drain_rx
+        self._viz_dirty = False  # Scan data changed since the last redraw
+        self._point_rgba = np.empty((0, 4))  # Viridis colors of the first N scan points
+        self._point_rgba_range = None  # (min_z, max_z) the cached colors were normalized with
+        self._reset_preview_cache()
+        self._pos_event = threading.Event()  # Set on every parsed status report
+        self._vl53_event = threading.Event()  # Set on every VL53 reading (valid or not)
+        self._grbl_banner_event = threading.Event()  # Set when GRBL prints its startup banner
+        self._serial_log_pending = deque(maxlen=1000)  # Serial log lines not yet in the widget
+        self._info_log_pending = deque(maxlen=1000)  # Info log lines not yet in the widget
+        self._info_log_lines = 0  # Lines currently in the info log widget
+        self._serial_log_lines = 0  # Lines currently in the serial log widget
+        self._ui_pending = {}  # Latest widget update per key from worker threads (see _post_ui)
+        self._z_test_pending = deque(maxlen=1000)  # Z test result text from the test thread (see _drain_ui)
+        self._test_tab_active = False  # Test tab showing: serial log and Z test results visible
+        self._pending_jog = None  # (axis, summed move, feed_rate) of the jog burst not yet sent
+        self._jog_after_id = None  # root.after id of the pending _flush_jog
+        self._port_list = None  # Ports currently listed in the port dropdown
 
         # Create GUI
         self.create_widgets()
 
+        # Redraw the 3D view at most every 200ms, however fast points arrive
+        self.root.after(200, self._viz_tick)
+        self.root.after(200, self._flush_serial_log)
+        self.root.after(200, self._flush_info_log)
+        self.root.after(50, self._drain_ui)
+
     def create_widgets(self):
         # Main container - horizontal layout
         main_frame = ttk.Frame(self.root, padding="5")
@@ -85,6 +194,8 @@ class ScannerGUI:
         # Tab 2: Test
         test_tab = ttk.Frame(notebook, padding="5")
         notebook.add(test_tab, text="Test")
+        self.notebook = notebook
+        self._test_tab = test_tab
 
         # Left panel - Controls (in Control tab)
         control_frame = ttk.LabelFrame(control_tab, text="Control Panel", padding="5")
@@ -118,6 +229,7 @@ class ScannerGUI:
         self.test_points = []
         self.is_testing = False
         self.vl53_reading_active = False
+        self._vl53_poll_job = None  # Pending root.after id for _poll_vl53
         self.z_layer_test_active = False  # Z layer test mode
         self.z_layer_test_data = []  # Store (z_height, distance) pairs
 
@@ -136,6 +248,8 @@ class ScannerGUI:
         # VL53L0X/VL53L1 offset calibration (mm)
         ttk.Label(geometry_frame, text="VL53 Offset (mm):").grid(row=3, column=0, sticky=tk.W, pady=1)
         self.vl53_offset_var = tk.StringVar(value="0.0")
+        self._vl53_offset = 0.0  # Parsed offset, refreshed by _on_vl53_offset_changed
+        self.vl53_offset_var.trace_add('write', self._on_vl53_offset_changed)
         ttk.Entry(geometry_frame, textvariable=self.vl53_offset_var, width=8).grid(row=3, column=1, sticky=tk.W, padx=2)
 
         ttk.Label(geometry_frame, text="Số điểm scan/vòng:").grid(row=1, column=0, sticky=tk.W, pady=1)
@@ -237,12 +351,32 @@ class ScannerGUI:
         # Matplotlib figure
         self.fig = Figure(figsize=(6, 5), dpi=100)
         self.ax = self.fig.add_subplot(111, projection='3d')
-        self.ax.set_xlabel('X (cm)')
-        self.ax.set_ylabel('Y (cm)')
-        self.ax.set_zlabel('Z (cm)')
-        self.ax.set_title('3D Scan Point Cloud')
+        # The axes are set up once; update_visualization swaps the mesh and moves the point cloud
+        self.ax.set_xlabel('X (mm)', fontsize=10)
+        self.ax.set_ylabel('Y (mm)', fontsize=10)
+        self.ax.set_zlabel('Z (mm)', fontsize=10)
+        self.ax.set_title('3D Scan Mesh - No data', fontsize=11)
+        self.ax.set_xlim(-10, 10)
+        self.ax.set_ylim(-10, 10)
+        self.ax.set_zlim(0, 20)
+        # Draw order follows zorder (point cloud above the mesh) rather than insertion order,
+        # since the point cloud artist outlives the meshes drawn with it
+        self.ax.computed_zorder = False
+        try:
+            self.ax.set_box_aspect([1, 1, 1])
+        except:
+            pass
+        self._viz_artists = []  # Mesh artists drawn by the last update_visualization
+        self._viz_scatter = None  # Point cloud artist, created once and updated in place
+        self._viz_limits = None  # Axis limits set by the last update_visualization
+        # Title, mesh and point cloud are animated: full redraws skip them and _on_viz_draw
+        # paints them over a saved copy of the static axes, so a new scan point only
+        # re-rasterizes these artists (see _draw_viz_artists)
+        self.ax.title.set_animated(True)
+        self._viz_bg = None
 
         self.canvas = FigureCanvasTkAgg(self.fig, canvas_container)
+        self.canvas.mpl_connect('draw_event', self._on_viz_draw)
         self.canvas.draw()
         self.canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=True)
 
@@ -269,6 +403,15 @@ class ScannerGUI:
         # Bind tab change event
         notebook.bind("<<NotebookTabChanged>>", self.on_tab_changed)
 
+        # Machine controls: enabled once GRBL is initialized, disabled on disconnect
+        self._machine_controls = [
+            self.scan_up_btn, self.scan_down_btn, self.vl53_read_btn,
+            *self.direction_buttons.values(),
+            self.rotate_x_cw_btn, self.rotate_x_ccw_btn, self.rotate_x_full_cw_btn, self.rotate_x_full_ccw_btn,
+            self.rotate_y_cw_btn, self.rotate_y_ccw_btn, self.rotate_y_full_cw_btn, self.rotate_y_full_ccw_btn,
+            self.z_test_btn,
+        ]
+
     def setup_test_tab(self, test_tab):
         """Setup Test tab content with GRBL-style controls"""
         # Info label at top
@@ -347,10 +490,9 @@ class ScannerGUI:
         sensor_type_combo.bind("<<ComboboxSelected>>", self.on_sensor_type_changed)
 
         # Large distance display
-        self.vl53_distance_var = tk.StringVar(value="--")
-        distance_display = ttk.Label(right_panel, textvariable=self.vl53_distance_var,
-                                    font=("Arial", 24, "bold"), foreground="blue")
-        distance_display.grid(row=1, column=0, pady=10)
+        self.vl53_distance_label = ttk.Label(right_panel, text="--",
+                                             font=("Arial", 24, "bold"), foreground="blue")
+        self.vl53_distance_label.grid(row=1, column=0, pady=10)
 
         ttk.Label(right_panel, text="mm", font=("Arial", 12)).grid(row=1, column=1, sticky=tk.W, padx=5)
 
@@ -360,9 +502,8 @@ class ScannerGUI:
         self.vl53_read_btn.grid(row=2, column=0, columnspan=2, pady=10, sticky=(tk.W, tk.E))
 
         # Status
-        self.vl53_status_var = tk.StringVar(value="Stopped")
-        ttk.Label(right_panel, textvariable=self.vl53_status_var, foreground="gray").grid(
-            row=3, column=0, columnspan=2, pady=5)
+        self.vl53_status_label = ttk.Label(right_panel, text="Stopped", foreground="gray")
+        self.vl53_status_label.grid(row=3, column=0, columnspan=2, pady=5)
 
         # Visual distance bar
         self.distance_canvas = tk.Canvas(right_panel, width=200, height=20, bg="lightgray")
@@ -379,13 +520,13 @@ class ScannerGUI:
 
         # X position displays angle (from GRBL Y axis after swap)
         ttk.Label(pos_frame, text="X (Góc quay, 0.1mm=10°):").grid(row=0, column=0, padx=5)
-        self.test_x_pos_var = tk.StringVar(value="0.0°")
-        ttk.Label(pos_frame, textvariable=self.test_x_pos_var, font=("Arial", 10, "bold")).grid(row=0, column=1, padx=5)
+        self.test_x_pos_label = ttk.Label(pos_frame, text="0.0°", font=("Arial", 10, "bold"))
+        self.test_x_pos_label.grid(row=0, column=1, padx=5)
 
         # Z position displays height (from GRBL Y axis, M8 lead screw)
         ttk.Label(pos_frame, text="Z (Chiều cao, M8 1rev=8mm):").grid(row=0, column=2, padx=5)
-        self.test_z_pos_var = tk.StringVar(value="0.0 mm")
-        ttk.Label(pos_frame, textvariable=self.test_z_pos_var, font=("Arial", 10, "bold")).grid(row=0, column=3, padx=5)
+        self.test_z_pos_label = ttk.Label(pos_frame, text="0.0 mm", font=("Arial", 10, "bold"))
+        self.test_z_pos_label.grid(row=0, column=3, padx=5)
 
         # Axis rotation controls
         axis_frame = ttk.LabelFrame(bottom_panel, text="Axis Rotation Controls", padding="10")
@@ -500,14 +641,30 @@ class ScannerGUI:
 
     def on_tab_changed(self, event):
         """Handle tab change"""
+        # Logs on the hidden tab stay queued (bounded) until it is shown again
+        self._test_tab_active = self.notebook.select() == str(self._test_tab)
         if self.test_points:
             self.test_points = []
             self.update_visualization()
 
     def refresh_ports(self):
-        """Refresh available serial ports"""
-        ports = serial.tools.list_ports.comports()
-        port_list = [port.device for port in ports]
+        """Refresh available serial ports
+
+        Enumeration can take 100+ ms (it walks the registry on Windows), so it runs on
+        a worker thread and the dropdown is filled by _drain_ui.
+        """
+        threading.Thread(target=self._list_ports, daemon=True).start()
+
+    def _list_ports(self):
+        """Enumerate serial ports (worker thread)"""
+        port_list = [port.device for port in serial.tools.list_ports.comports()]
+        self._post_ui('ports', lambda: self._show_ports(port_list))
+
+    def _show_ports(self, port_list):
+        """Fill the port dropdown, leaving it alone when the ports did not change"""
+        if port_list == self._port_list:
+            return
+        self._port_list = port_list
         self.port_combo['values'] = port_list
         if port_list and not self.port_var.get():
             self.port_var.set(port_list[0])
@@ -522,10 +679,17 @@ class ScannerGUI:
 
             try:
                 self.serial_conn = serial.Serial(port, 115200, timeout=2, write_timeout=2)  # Increased timeout to 2s
-                time.sleep(2)
+                # USB-serial adapters (FTDI) hold received bytes up to 16ms by default; ask the
+                # Linux driver to push them out immediately. Other drivers/platforms refuse: ignore
+                if hasattr(self.serial_conn, 'set_low_latency_mode'):
+                    try:
+                        self.serial_conn.set_low_latency_mode(True)
+                    except (ValueError, OSError):
+                        pass
+                self._grbl_banner_event.clear()
                 self.is_connected = True
                 self.connect_btn.config(text="Disconnect")
-                self.status_label.config(text="Status: Connected", foreground="green")
+                self.status_label.config(text="Status: Connecting...", foreground="orange")
 
                 # ========================================
                 # STARTUP BANNER - Display calibration info
@@ -544,61 +708,62 @@ class ScannerGUI:
                 self.log_info("  • Conversion: mm = GRBL_X × 10")
                 self.log_info("=" * 60)
 
-                # Enable buttons
-                if hasattr(self, 'scan_up_btn'):
-                    self.scan_up_btn.config(state=tk.NORMAL)
-                if hasattr(self, 'scan_down_btn'):
-                    self.scan_down_btn.config(state=tk.NORMAL)
-                if hasattr(self, 'vl53_read_btn'):
-                    self.vl53_read_btn.config(state=tk.NORMAL)
-                if hasattr(self, 'direction_buttons'):
-                    for btn in self.direction_buttons.values():
-                        btn.config(state=tk.NORMAL)
-                if hasattr(self, 'rotate_x_cw_btn'):
-                    self.rotate_x_cw_btn.config(state=tk.NORMAL)
-                    self.rotate_x_ccw_btn.config(state=tk.NORMAL)
-                    self.rotate_x_full_cw_btn.config(state=tk.NORMAL)
-                    self.rotate_x_full_ccw_btn.config(state=tk.NORMAL)
-                if hasattr(self, 'rotate_y_cw_btn'):
-                    self.rotate_y_cw_btn.config(state=tk.NORMAL)
-                    self.rotate_y_ccw_btn.config(state=tk.NORMAL)
-                    self.rotate_y_full_cw_btn.config(state=tk.NORMAL)
-                    self.rotate_y_full_ccw_btn.config(state=tk.NORMAL)
-                if hasattr(self, 'z_test_btn'):
-                    self.z_test_btn.config(state=tk.NORMAL)
-
                 # Start serial reading thread
                 self.serial_thread = threading.Thread(target=self.read_serial, daemon=True)
                 self.serial_thread.start()
-
-                # Start status query thread
-                self.status_query_active = True
-                self.status_query_thread = threading.Thread(target=self.status_query_loop, daemon=True)
-                self.status_query_thread.start()
+                if self._rx_drain_job is None:
+                    self._rx_drain_job = self.root.after(20, self._drain_rx)
 
                 self.log_info("Connected to " + port)
 
-                # Initialize GRBL
-                time.sleep(2)
-                if self.serial_conn:
-                    self.serial_conn.reset_input_buffer()
-                    self.send_serial_command(b"\x18\n", log=True)
-                    time.sleep(0.5)
-                    self.send_serial_command("?\n", log=True)
-                    self.send_serial_command("$X\n", log=True)
-                    self.log_info("GRBL initialized - watching for position updates...")
+                # Initialize GRBL once it has booted: opening the port resets the Arduino, and
+                # anything sent while its bootloader runs is lost. The startup banner (or 2s
+                # for boards that don't reset on open) marks the end of boot; the GUI stays
+                # responsive meanwhile
+                self._await_grbl_banner(time.monotonic() + 2.0, self._reset_grbl)
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to connect: {str(e)}")
         else:
             self.disconnect()
 
+    def _await_grbl_banner(self, deadline, then):
+        """Call then() once GRBL prints its startup banner or the deadline passes (Tk thread)"""
+        if not self.is_connected:
+            return
+        if self._grbl_banner_event.is_set() or time.monotonic() >= deadline:
+            then()
+        else:
+            self.root.after(50, self._await_grbl_banner, deadline, then)
+
+    def _reset_grbl(self):
+        """Soft-reset GRBL, then finish initializing once it has restarted"""
+        self._grbl_banner_event.clear()
+        self.send_serial_command(_CMD_RESET, log=True)
+        self._await_grbl_banner(time.monotonic() + 0.5, self._finish_grbl_init)
+
+    def _finish_grbl_init(self):
+        """Unlock GRBL and enable the machine controls"""
+        self.send_serial_command(_CMD_STATUS, log=True)
+        self.send_serial_command(_CMD_UNLOCK, log=True)
+        self.log_info("GRBL initialized - watching for position updates...")
+        self.status_label.config(text="Status: Connected", foreground="green")
+
+        # Start status query thread
+        self.status_query_active = True
+        self.status_query_thread = threading.Thread(target=self.status_query_loop, daemon=True)
+        self.status_query_thread.start()
+
+        # Enable buttons
+        for widget in self._machine_controls:
+            widget.config(state=tk.NORMAL)
+
     def disconnect(self):
         """Disconnect from serial port"""
         if self.is_connected:
             self.status_query_active = False
             if self.is_scanning:
                 if self.serial_conn:
-                    self.serial_conn.write(b"STOP\n")
+                    self.serial_conn.write(_CMD_STOP)
                 self.is_scanning = False
             self.is_connected = False
             if self.serial_conn:
@@ -606,53 +771,26 @@ class ScannerGUI:
             self.connect_btn.config(text="Connect")
             self.status_label.config(text="Status: Disconnected", foreground="red")
 
-            # Disable buttons
-            if hasattr(self, 'scan_up_btn'):
-                self.scan_up_btn.config(state=tk.DISABLED)
-            if hasattr(self, 'scan_down_btn'):
-                self.scan_down_btn.config(state=tk.DISABLED)
-            self.pause_btn.config(state=tk.DISABLED)
-            if hasattr(self, 'resume_btn'):
-                self.resume_btn.config(state=tk.DISABLED)
-            if hasattr(self, 'vl53_read_btn'):
-                self.vl53_reading_active = False
-                self.vl53_read_btn.config(state=tk.DISABLED)
-                self.vl53_read_btn.config(text="Start Reading")
-                self.vl53_status_var.set("Stopped")
-                if hasattr(self, 'vl53_distance_var'):
-                    self.vl53_distance_var.set("--")
-            if hasattr(self, 'direction_buttons'):
-                for btn in self.direction_buttons.values():
-                    btn.config(state=tk.DISABLED)
-            if hasattr(self, 'rotate_x_cw_btn'):
-                self.rotate_x_cw_btn.config(state=tk.DISABLED)
-                self.rotate_x_ccw_btn.config(state=tk.DISABLED)
-                self.rotate_x_full_cw_btn.config(state=tk.DISABLED)
-                self.rotate_x_full_ccw_btn.config(state=tk.DISABLED)
-            if hasattr(self, 'rotate_y_cw_btn'):
-                self.rotate_y_cw_btn.config(state=tk.DISABLED)
-                self.rotate_y_ccw_btn.config(state=tk.DISABLED)
-                self.rotate_y_full_cw_btn.config(state=tk.DISABLED)
-                self.rotate_y_full_ccw_btn.config(state=tk.DISABLED)
-            if hasattr(self, 'move_to_top_btn'):
-                self.move_to_top_btn.config(state=tk.DISABLED)
-            if hasattr(self, 'home_btn'):
-                self.home_btn.config(state=tk.DISABLED)
-            if hasattr(self, 'z_test_btn'):
-                self.z_test_btn.config(state=tk.DISABLED)
-                if self.z_layer_test_active:
-                    self.z_layer_test_active = False
-                    self.z_test_btn.config(text="Bắt đầu Test Z")
+            # Disable buttons (scan pause/resume and the manual moves as well)
+            for widget in self._machine_controls + [self.pause_btn, self.resume_btn,
+                                                    self.move_to_top_btn, self.home_btn]:
+                widget.config(state=tk.DISABLED)
+            self.vl53_reading_active = False
+            self.vl53_read_btn.config(text="Start Reading")
+            self.vl53_status_label.config(text="Stopped")
+            self.vl53_distance_label.config(text="--")
+            if self.z_layer_test_active:
+                self.z_layer_test_active = False
+                self.z_test_btn.config(text="Bắt đầu Test Z")
             self.log_info("Disconnected")
 
     def send_serial_command(self, command, log=True):
         """Send command to serial and log it"""
         if self.serial_conn:
             try:
-                # Clear input buffer before sending to prevent timeout
-                if self.serial_conn.in_waiting > 0:
-                    self.serial_conn.reset_input_buffer()
-                
+                # The input side is drained continuously by read_serial; flushing it here
+                # would throw away replies (e.g. a VL53 reading) that are still in flight
+
                 # Clear output buffer if it's getting full (prevent write timeout)
                 try:
                     if hasattr(self.serial_conn, 'out_waiting') and self.serial_conn.out_waiting > 100:
@@ -682,17 +820,19 @@ class ScannerGUI:
                 if log:
                     try:
                         cmd_str = command_bytes.decode('utf-8', errors='replace').strip()
-                        cmd_str = cmd_str.replace('\x18', '[RESET]').replace('\r', '').replace('\n', '')
+                        cmd_str = cmd_str.replace('\x18', '[RESET]').replace('\r', '').replace('\n', ' ')
 
                         # ============================================
-                        # CONSOLE LOG: Print ALL sent commands
+                        # CONSOLE LOG: Print ALL sent commands (when tracing)
                         # ============================================
-                        print(f"[SERIAL TX] {cmd_str}")
+                        if self.trace_serial:
+                            print(f"[SERIAL TX] {cmd_str}")
 
                         # Log to GUI
                         self.log_serial_send(cmd_str)
                     except:
-                        print(f"[SERIAL TX] [BINARY: {len(command_bytes)} bytes]")
+                        if self.trace_serial:
+                            print(f"[SERIAL TX] [BINARY: {len(command_bytes)} bytes]")
                         self.log_serial_send(f"[BINARY: {len(command_bytes)} bytes]")
             except Exception as e:
                 print(f"[ERROR] Failed to send command: {str(e)}")
@@ -703,7 +843,7 @@ class ScannerGUI:
         while self.status_query_active and self.is_connected:
             try:
                 if self.serial_conn:
-                    self.send_serial_command("?\n", log=False)
+                    self.send_serial_command(_CMD_STATUS, log=False)
                 time.sleep(0.2)
             except Exception as e:
                 if self.status_query_active:
@@ -712,20 +852,72 @@ class ScannerGUI:
 
     def read_serial(self):
         """Read data from serial port in background thread"""
-        while self.is_connected and self.serial_conn:
-            try:
-                if self.serial_conn.in_waiting > 0:
-                    line = self.serial_conn.readline().decode('utf-8', errors='ignore').strip()
-                    if line:
-                        # CALLBACK: Log ALL serial data to console
-                        self.on_serial_received(line)
-                else:
-                    # If no data waiting, clear any stale data in buffer periodically
-                    time.sleep(0.01)  # Small delay to prevent CPU spinning
-            except Exception as e:
-                if self.is_connected:
-                    self.log_info(f"Serial error: {str(e)}")
-                break
+        rx = bytearray()  # Received bytes not yet terminated by a newline
+        # Sleep in the kernel until the port has data (epoll/poll on the tty fd) instead of
+        # waking every 10ms to check in_waiting. Windows COM handles have no selectable fd,
+        # so there we keep the short polling sleep.
+        selector = selectors.DefaultSelector()
+        try:
+            selector.register(self.serial_conn.fileno(), selectors.EVENT_READ)
+        except (OSError, ValueError):
+            selector.close()
+            selector = None
+        try:
+            while self.is_connected and self.serial_conn:
+                try:
+                    waiting = self.serial_conn.in_waiting
+                    if waiting > 0:
+                        # Take everything buffered in one read, then split off the complete lines
+                        rx += self.serial_conn.read(waiting)
+                        end = rx.rfind(b'\n')
+                        if end >= 0:
+                            # One decode for the whole batch of complete lines
+                            for line in rx[:end].decode('utf-8', errors='ignore').split('\n'):
+                                line = line.strip()
+                                if line.startswith("<"):
+                                    # Hand off to the Tk main thread (see _drain_rx)
+                                    self._rx_status.append(line)
+                                elif line:
+                                    self._rx_queue.append(line)
+                            del rx[:end + 1]
+                    elif selector is not None:
+                        # Timeout so a disconnect is noticed even if the port stays silent
+                        selector.select(timeout=0.1)
+                    else:
+                        time.sleep(0.01)  # Small delay to prevent CPU spinning
+                except Exception as e:
+                    if self.is_connected:
+                        self.log_info(f"Serial error: {str(e)}")
+                    break
+        finally:
+            if selector is not None:
+                selector.close()
+
+    def _drain_rx(self):
+        """Process lines queued by the reader thread (runs on the Tk main thread)
+
+        Status reports are idempotent, so only the newest one is kept and it is
+        processed after the other lines of the batch; replies such as ok or a
+        VL53 reading, which the scan threads wait for, are never dropped.
+        """
+        if not self.is_connected:
+            self._rx_queue.clear()
+            self._rx_status.clear()
+            self._rx_drain_job = None
+            return
+
+        lines = []
+        while self._rx_queue:
+            lines.append(self._rx_queue.popleft())
+        try:
+            lines.append(self._rx_status.popleft())
+        except IndexError:
+            pass
+
+        for line in lines:
+            self.on_serial_received(line)
+
+        self._rx_drain_job = self.root.after(20, self._drain_rx)
 
     def on_serial_received(self, line):
         """
@@ -733,9 +925,10 @@ class ScannerGUI:
         This is where ALL serial data arrives FIRST
         """
         # ============================================
-        # CONSOLE LOG: Print RAW received data (BEFORE PARSE)
+        # CONSOLE LOG: Print RAW received data (BEFORE PARSE, when tracing)
         # ============================================
-        print(f"[RX RAW] {line}")
+        if self.trace_serial:
+            print(f"[RX RAW] {line}")
 
         # Log to GUI serial log
         self.log_serial_receive(line)
@@ -751,6 +944,8 @@ class ScannerGUI:
         # ============================================
         # CONSOLE LOG: Print PARSED data (AFTER PARSE)
         # ============================================
+        if not self.trace_status_parse:
+            return  # Several reports a second: only traced when debugging
         print(f"[PARSED] Type: {data_type}, Data: {parsed_data}")
 
         # Log to GUI if needed
@@ -763,27 +958,18 @@ class ScannerGUI:
 
     def process_serial_data(self, line):
         """Process incoming serial data from GRBL firmware"""
-        # Clear input buffer after processing to prevent overflow
-        if self.serial_conn and self.serial_conn.in_waiting > 100:  # If buffer has more than 100 bytes
-            try:
-                # Read and discard excess data
-                while self.serial_conn.in_waiting > 50:
-                    self.serial_conn.read(self.serial_conn.in_waiting)
-            except:
-                pass
-        
         # Handle GRBL status reports: <Idle|MPos:0.000,0.000,0.000|FS:0,0>
         if line.startswith("<"):
-            # ============================================
-            # CONSOLE LOG: Confirm we caught GRBL status
-            # ============================================
-            print(f"[PROCESS] Detected GRBL status line, calling parse_grbl_status()...")
             self.parse_grbl_status(line)
             return
 
         # Handle GRBL responses
         if line.startswith("ok"):
             return
+        elif line.startswith("Grbl"):
+            # Startup banner, e.g. "Grbl 0.9j ['$' for help]": GRBL is ready for commands
+            self._grbl_banner_event.set()
+            return
         elif line.startswith("error:"):
             self.log_info(f"GRBL Error: {line}")
             return
@@ -793,35 +979,23 @@ class ScannerGUI:
 
         # Handle VL53L0X/VL53L1 distance reading
         # Format: VL53L1_DISTANCE:138 hoặc VL53L0X_DISTANCE:138
-        if "VL53L0X" in line.upper() or "VL53L1" in line.upper() or line.startswith("DISTANCE:"):
+        # Firmware always emits the tag as an upper-case prefix, so no .upper() copy is needed
+        if line.startswith(("VL53", "DISTANCE:")):
             try:
-                import re
-                # Auto-detect sensor type from response and update UI
-                if "VL53L1" in line.upper():
-                    self.vl53_sensor_type = "VL53L1"
-                    # Update UI dropdown if it exists
-                    if hasattr(self, 'vl53_sensor_type_var'):
-                        self.root.after(0, lambda: self.vl53_sensor_type_var.set("VL53L1"))
-                elif "VL53L0X" in line.upper():
-                    self.vl53_sensor_type = "VL53L0X"
-                    # Update UI dropdown if it exists
-                    if hasattr(self, 'vl53_sensor_type_var'):
-                        self.root.after(0, lambda: self.vl53_sensor_type_var.set("VL53L0X"))
-                
+                # Auto-detect sensor type from response and update UI dropdown (only on change)
+                sensor = "VL53L1" if line.startswith("VL53L1") else "VL53L0X" if line.startswith("VL53L0X") else None
+                if sensor and sensor != self.vl53_sensor_type:
+                    self.vl53_sensor_type = sensor
+                    self.vl53_sensor_type_var.set(sensor)
+
                 # Parse format: VL53L1_DISTANCE:138
-                if ":" in line:
-                    parts = line.split(":")
-                    if len(parts) > 1:
-                        dist_str = parts[1].strip()
-                        # Remove all non-numeric characters except decimal point
-                        dist_str = re.sub(r'[^0-9.]', '', dist_str)
-                        if dist_str:
-                            distance_mm = float(dist_str)
-                            self.update_vl53_display(distance_mm)
-                            return
+                match = _RE_VL53_DISTANCE.match(line)
+                if match:
+                    self.update_vl53_display(float(match.group(1)))
+                    return
 
                 # Fallback: Try to find number with unit (mm/cm)
-                match = re.search(r'(\d+\.?\d*)\s*(mm|cm)', line, re.IGNORECASE)
+                match = _RE_DISTANCE_UNIT.search(line)
                 if match:
                     distance = float(match.group(1))
                     unit = match.group(2).lower()
@@ -845,163 +1019,68 @@ class ScannerGUI:
 
         GRBL 0.9j format: <Idle,MPos:0.100,0.000,0.000,WPos:0.100,0.000,0.000>
         """
-        print(f"\n{'='*70}")
-        print(f"[PARSE] ▶ START PARSING")
-        print(f"[PARSE] Input: {status_line}")
-
         try:
-            # Step 1: Remove < and >
-            print(f"[PARSE] Step 1: Removing < and >...")
-            clean = status_line.strip("<>")
-            print(f"[PARSE] Step 1 result: '{clean}'")
-
-            # Step 2: Find MPos section
-            # GRBL 0.9j format: Idle,MPos:X,Y,Z,WPos:X,Y,Z
-            print(f"[PARSE] Step 2: Looking for 'MPos:' in string...")
-
-            if "MPos:" not in clean:
-                print(f"[PARSE] ✗ ERROR: No 'MPos:' found in status!")
-                print(f"{'='*70}\n")
-                return
-
-            print(f"[PARSE] Step 2: ✓ Found 'MPos:'")
-
-            # Step 3: Extract state (first part before comma)
-            print(f"[PARSE] Step 3: Extracting state...")
-            first_comma = clean.find(',')
-            if first_comma > 0:
-                self.grbl_state = clean[:first_comma]
-                print(f"[PARSE] Step 3: State = '{self.grbl_state}'")
-            else:
-                print(f"[PARSE] Step 3: Warning - no comma found, can't extract state")
-
-            # Step 4: Extract MPos values
-            print(f"[PARSE] Step 4: Extracting MPos section...")
-            mpos_start = clean.find("MPos:") + 5  # After "MPos:"
-            print(f"[PARSE] Step 4: MPos starts at index {mpos_start}")
-
-            # Find end of MPos (either WPos or end of string)
-            mpos_end = clean.find(",WPos:", mpos_start)
-            if mpos_end == -1:
-                mpos_end = len(clean)  # No WPos, go to end
-
-            print(f"[PARSE] Step 4: MPos ends at index {mpos_end}")
-
-            mpos_str = clean[mpos_start:mpos_end]
-            print(f"[PARSE] Step 4: MPos string = '{mpos_str}'")
-
-            # Step 5: Split MPos values by comma
-            print(f"[PARSE] Step 5: Splitting MPos values by comma...")
-            positions = mpos_str.split(",")
-            print(f"[PARSE] Step 5: Got {len(positions)} values: {positions}")
-
-            if len(positions) < 2:
-                print(f"[PARSE] ✗ ERROR: Need at least 2 positions, got {len(positions)}")
-                print(f"{'='*70}\n")
-                return
-
-            # Step 6: Parse X and Y
+            # Steps 1-6: Match state and MPos values in a single pass
+            # GRBL 0.9j format: <Idle,MPos:X,Y,Z,WPos:X,Y,Z> (GRBL 1.1 uses '|' separators)
             # NOTE: format_gcode_command swaps X and Y when sending:
             #   GUI X (rotation) → sent as GRBL X (direct value)
             #   GUI Z (height) → sent as GRBL Y (divided by 10)
             # So when parsing:
-            #   positions[0] (GRBL X) = rotation (direct mm value)
-            #   positions[1] (GRBL Y) = height units → multiply by 10 to get mm
-            print(f"[PARSE] Step 6: Parsing position values...")
-            try:
-                # GRBL X (positions[0]) is rotation (GUI X) - direct value
-                x_mm = float(positions[0])
-                print(f"[PARSE] Step 6: X (rotation from GRBL X) = {x_mm} mm")
-            except ValueError as e:
-                print(f"[PARSE] ✗ ERROR parsing X from '{positions[1]}': {e}")
-                print(f"{'='*70}\n")
+            #   group 2 (GRBL X) = rotation (direct mm value)
+            #   group 3 (GRBL Y) = height units → multiply by 10 to get mm
+            match = _RE_GRBL_STATUS.match(status_line)
+            if not match:
+                print(f"[PARSE] ✗ ERROR: No 'MPos:' found in status: {status_line}")
                 return
 
-            try:
-                # GRBL Y (positions[1]) is height (GUI Z) - need to multiply by 10
-                # Because: G1 Y0.1 = 45° motor = 1mm actual movement
-                # Formula: mm_actual = GRBL_Y_value × 10
-                y_grbl_units = float(positions[1])
-                y_mm = y_grbl_units * 10.0  # Convert GRBL units to actual mm
-                print(f"[PARSE] Step 6: Y (height from GRBL Y) = {y_grbl_units} units = {y_mm:.1f} mm")
-            except ValueError as e:
-                print(f"[PARSE] ✗ ERROR parsing Y from '{positions[0]}': {e}")
-                print(f"{'='*70}\n")
-                return
-
-            # Parse Z if available
-            if len(positions) >= 3:
-                try:
-                    z_mm = float(positions[2])
-                    print(f"[PARSE] Step 6: Z = {z_mm} mm")
-                    self.current_z_pos = z_mm
-                except:
-                    print(f"[PARSE] Step 6: Warning - couldn't parse Z")
+            self.grbl_state = match.group(1)
+            x_mm = float(match.group(2))
+            # G1 Y0.1 = 45° motor = 1mm actual movement, so mm_actual = GRBL_Y_value × 10
+            y_grbl_units = float(match.group(3))
+            y_mm = y_grbl_units * 10.0
+            if match.group(4) is not None:
+                self.current_z_pos = float(match.group(4))
 
             # Step 7: Update internal state
-            print(f"[PARSE] Step 7: Updating internal variables...")
             self.current_x_pos = x_mm  # Rotation from GRBL X (direct mm)
             self.current_y_pos = y_mm  # Height from GRBL Y (converted to actual mm)
-            print(f"[PARSE] Step 7: ✓ Internal state updated")
-            print(f"[PARSE] Step 7: X = {x_mm:.3f}mm (rotation from GRBL X), Y = {y_mm:.1f}mm (height from GRBL Y)")
 
             # Step 8: Calculate angle from X position
-            print(f"[PARSE] Step 8: Calculating angle from X position...")
-            print(f"[PARSE] Step 8: Formula: {x_mm:.3f} mm × 100 = ? degrees")
             angle = x_mm * 100.0
-            print(f"[PARSE] Step 8: Raw angle = {angle:.1f}°")
 
             # Step 9: Normalize to 0-360
-            print(f"[PARSE] Step 9: Normalizing angle...")
+            # X accumulates over many turns, so a single +/-360 wrap is not enough;
+            # Python's float % already returns a value in [0, 360) for negative input
             angle = angle % 360.0
-            if angle < 0:
-                angle += 360.0
-            print(f"[PARSE] Step 9: ✓ Final angle = {angle:.1f}°")
 
             self.current_angle = angle
+            # Wake the scan thread if it is waiting for a position update
+            self._pos_event.set()
 
             # Step 10: Calculate Z height (already converted to mm in step 6)
             # M8 lead screw: 1 motor revolution (360°) = 8mm
             # Full step: 45° motor = 1mm, 90° motor = 2mm, etc.
             z_height_mm = y_mm
-            print(f"[PARSE] Step 10: Z height = {z_height_mm:.1f}mm (actual measurement)")
 
             # Step 11: Log result (simplified - only angle for X)
-            print(f"[PARSE] Step 11: Logging result...")
             result_msg = f"Angle={angle:.1f}°, Z={z_height_mm:.1f}mm"
-            print(f"[RESULT] ✓ {result_msg}")
+            if self.trace_status_parse:
+                print(f"[PARSE] {status_line} → State={self.grbl_state}, X={x_mm:.3f}mm, "
+                      f"Y={y_grbl_units} units, {result_msg}")
             # Only log to GUI if significant change (>=1.5mm, close to layer height of 2mm)
             # This prevents spam during slow Z movement between layers
-            if not hasattr(self, '_last_logged_z') or abs(z_height_mm - self._last_logged_z) >= 1.5:
+            if self._last_logged_z is None or abs(z_height_mm - self._last_logged_z) >= 1.5:
                 self.log_info(f"✓ Position: {result_msg}")
                 self._last_logged_z = z_height_mm
 
-            # Step 12: Update GUI
-            print(f"[PARSE] Step 12: Updating GUI display...")
-            has_x_var = hasattr(self, 'test_x_pos_var')
-            has_z_var = hasattr(self, 'test_z_pos_var')
-            print(f"[PARSE] Step 12: Variables exist - X:{has_x_var}, Z:{has_z_var}")
-
-            if has_x_var:
-                try:
-                    self.test_x_pos_var.set(f"{angle:.1f}°")
-                    print(f"[GUI] ✓ X display set to: {angle:.1f}°")
-                except Exception as e:
-                    print(f"[GUI] ✗ Failed to set X: {e}")
-
-            if has_z_var:
-                try:
-                    self.test_z_pos_var.set(f"{z_height_mm:.2f} mm")
-                    print(f"[GUI] ✓ Z display set to: {z_height_mm:.2f} mm")
-                except Exception as e:
-                    print(f"[GUI] ✗ Failed to set Z: {e}")
-
-            # Backup update via root.after
-            try:
-                self.root.after(0, lambda: self._update_position_vars(angle, z_height_mm))
-                print(f"[GUI] ✓ Scheduled backup update")
-            except Exception as e:
-                print(f"[GUI] ✗ Failed to schedule backup: {e}")
+            # Step 12: Update GUI (only when the position actually changed)
+            pos_key = (angle, z_height_mm)
+            if pos_key != self._last_pos_key:
+                self._last_pos_key = pos_key
+                angle_str = f"{angle:.1f}°"
+                z_str = f"{z_height_mm:.2f} mm"
+                self.test_x_pos_label.config(text=angle_str)
+                self.test_z_pos_label.config(text=z_str)
 
             # Call parsed callback
             parsed_data = {
@@ -1013,22 +1092,12 @@ class ScannerGUI:
             }
             self.on_data_parsed('position', parsed_data)
 
-            print(f"{'='*70}")
-            print(f"[PARSE] ✓✓✓ PARSE COMPLETE - SUCCESS!")
-            print(f"{'='*70}\n")
-
         except Exception as e:
-            print(f"\n{'='*70}")
-            print(f"[PARSE] ✗✗✗ EXCEPTION!")
-            print(f"[PARSE] Type: {type(e).__name__}")
-            print(f"[PARSE] Message: {str(e)}")
-            print(f"{'='*70}")
-
-            import traceback
-            traceback.print_exc()
-
-            self.log_info(f"ERROR: {str(e)}")
-            print(f"{'='*70}\n")
+            # Rate-limit error reporting so a noisy serial link can't flood the log
+            now = time.monotonic()
+            if now - self._last_parse_error_time > 1.0:
+                self._last_parse_error_time = now
+                self.log_info(f"Status parse error: {e!r}")
 
     def update_test_position_display(self):
         """Update position display in test tab
@@ -1036,82 +1105,67 @@ class ScannerGUI:
         - X shows rotation angle (from GRBL X): 0.1mm GRBL = 10°, angle = value × 100
         - Z shows height (from GRBL Y): converted to actual mm (GRBL × 10)
         """
+        # Force the next status report to refresh the display
+        self._last_pos_key = None
         try:
-            if hasattr(self, 'test_x_pos_var'):
-                # X shows angle (from GRBL X, calculated as GRBL_X × 100)
-                self.test_x_pos_var.set(f"{self.current_angle:.1f}°")
-
-            if hasattr(self, 'test_z_pos_var'):
-                # Z shows height (from GRBL Y, already converted to actual mm)
-                self.test_z_pos_var.set(f"{self.current_y_pos:.1f} mm")
+            # X shows angle (from GRBL X, calculated as GRBL_X × 100)
+            self.test_x_pos_label.config(text=f"{self.current_angle:.1f}°")
+            # Z shows height (from GRBL Y, already converted to actual mm)
+            self.test_z_pos_label.config(text=f"{self.current_y_pos:.1f} mm")
         except Exception as e:
             self.log_info(f"Error updating position display: {str(e)}")
 
-    def _update_position_vars(self, angle, height):
-        """Helper function to update position variables (called from main thread)"""
-        try:
-            if hasattr(self, 'test_x_pos_var'):
-                self.test_x_pos_var.set(f"{angle:.1f}°")
-            else:
-                # Variable not initialized yet
-                pass
-
-            if hasattr(self, 'test_z_pos_var'):
-                self.test_z_pos_var.set(f"{height:.2f} mm")
-            else:
-                # Variable not initialized yet
-                pass
-        except Exception as e:
-            # Silently ignore errors during initialization
-            pass
-
     def update_vl53_display(self, distance_mm):
         """Update VL53L0X distance display with offset calibration"""
         # Store current distance reading for scan processing
         if distance_mm > 0 and distance_mm < 8190:
             # Apply offset calibration
-            try:
-                offset = float(self.vl53_offset_var.get())
-                distance_mm = distance_mm + offset
-            except:
-                offset = 0.0
-            
+            distance_mm = distance_mm + self._vl53_offset
+
             self.current_vl53_distance = distance_mm
-        
-        if hasattr(self, 'vl53_distance_var'):
-            if distance_mm >= 8190:
-                self.vl53_distance_var.set("OUT OF RANGE")
-                if hasattr(self, 'vl53_status_var'):
-                    self.vl53_status_var.set("Out of range (>2000mm)")
-            elif distance_mm == 0:
-                self.vl53_distance_var.set("ERROR")
-                if hasattr(self, 'vl53_status_var'):
-                    self.vl53_status_var.set("Error/Timeout")
-            else:
-                self.vl53_distance_var.set(f"{distance_mm:.1f} mm")
-                if hasattr(self, 'vl53_status_var') and self.vl53_reading_active:
-                    if distance_mm < 20:
-                        self.vl53_status_var.set("Too close (<20mm)")
-                    elif distance_mm > 2000:
-                        self.vl53_status_var.set("Too far (>2000mm)")
-                    else:
-                        self.vl53_status_var.set("OK")
+        # Wake the scan thread if it is waiting for this reading
+        self._vl53_event.set()
+
+        status = None  # None leaves the status label as it is
+        if distance_mm >= 8190:
+            distance_text = "OUT OF RANGE"
+            status = "Out of range (>2000mm)"
+        elif distance_mm == 0:
+            distance_text = "ERROR"
+            status = "Error/Timeout"
+        else:
+            distance_text = f"{distance_mm:.1f} mm"
+            if self.vl53_reading_active:
+                if distance_mm < 20:
+                    status = "Too close (<20mm)"
+                elif distance_mm > 2000:
+                    status = "Too far (>2000mm)"
+                else:
+                    status = "OK"
+        # A steady target repeats the same texts reading after reading: only touch the
+        # labels (and queue a relayout/redraw) when the text changes
+        if str(self.vl53_distance_label.cget('text')) != distance_text:
+            self.vl53_distance_label.config(text=distance_text)
+        if status is not None and str(self.vl53_status_label.cget('text')) != status:
+            self.vl53_status_label.config(text=status)
 
         # Update visual bar
-        if hasattr(self, 'distance_canvas'):
-            max_distance = 2000.0
-            if distance_mm == 0 or distance_mm >= 8190:
-                bar_width = 0
-                color = "gray"
+        max_distance = 2000.0
+        if distance_mm == 0 or distance_mm >= 8190:
+            bar_width = 0
+            color = "gray"
+        else:
+            display_distance = min(max(distance_mm, 0), max_distance)
+            bar_width = min(200, int((display_distance / max_distance) * 200))
+            if distance_mm < 100:
+                color = "red"
+            elif distance_mm < 500:
+                color = "orange"
             else:
-                display_distance = min(max(distance_mm, 0), max_distance)
-                bar_width = min(200, int((display_distance / max_distance) * 200))
-                if distance_mm < 100:
-                    color = "red"
-                elif distance_mm < 500:
-                    color = "orange"
-                else:
-                    color = "green"
+                color = "green"
+        # Most readings leave the bar unchanged; skip the canvas round-trips then
+        if (bar_width, color) != self._last_bar:
+            self._last_bar = (bar_width, color)
             self.distance_canvas.coords(self.distance_bar, 0, 0, bar_width, 20)
             self.distance_canvas.itemconfig(self.distance_bar, fill=color)
 
@@ -1122,10 +1176,9 @@ class ScannerGUI:
         - x_move (rotation, GUI X → GRBL X): Direct value, 0.1mm = 10°
         - y_move (height, GUI Z → GRBL Y): Convert mm to GRBL units (÷ 10)
           Example: y_move=2.0mm → G1 Y0.2 → motor 90° → 2mm actual movement
-        """
-        feed_rate_float = max(1.0, float(feed_rate))
-        feed_rate = int(feed_rate_float) if feed_rate_float.is_integer() else feed_rate_float
 
+        Returns an empty list when the moves are too small to produce an axis word.
+        """
         commands = []
         commands.append("G91\n")
 
@@ -1133,48 +1186,36 @@ class ScannerGUI:
 
         # Rotation axis: GUI X → GRBL X (direct value)
         if abs(x_move) >= 0.0001:  # Reduced threshold for smaller steps
-            # Format with enough precision - ensure at least 3 decimal places for small values
-            if abs(x_move) < 1.0:
-                x_str = f"{x_move:.4f}".rstrip('0').rstrip('.')
-            else:
-                x_str = f"{x_move:.3f}".rstrip('0').rstrip('.')
-            # Ensure we have at least one digit after decimal point for GRBL
-            if '.' not in x_str or x_str.endswith('.'):
-                x_str = f"{x_move:.4f}".rstrip('0').rstrip('.')
-            move_parts.append(f"X{x_str}")
+            # Keep 4 decimals for small steps, 3 for larger moves
+            move_parts.append(f"X{_fmt(x_move, 4 if abs(x_move) < 1.0 else 3)}")
 
         # Height axis: GUI Z → GRBL Y (convert mm to GRBL units)
         # Formula: GRBL_Y_value = mm / 10
         # Example: 2mm → 0.2, 5mm → 0.5, 10mm → 1.0
         if abs(y_move) >= 0.01:
             y_grbl_units = y_move * 0.1  # Convert mm to GRBL units
-            y_str = f"{y_grbl_units:.2f}".rstrip('0').rstrip('.')
-            move_parts.append(f"Y{y_str}")
+            move_parts.append(f"Y{_fmt(y_grbl_units, 2)}")
 
-        if isinstance(feed_rate, int) or (isinstance(feed_rate, float) and feed_rate.is_integer()):
-            f_str = f"{int(feed_rate)}"
-        else:
-            f_str = f"{feed_rate:.1f}".rstrip('0').rstrip('.')
-        move_parts.append(f"F{f_str}")
+        if len(move_parts) == 1:
+            return []
+
+        move_parts.append(f"F{_fmt(max(1.0, float(feed_rate)), 1)}")
 
         commands.append("".join(move_parts) + "\n")
         commands.append("G90\n")
 
         return commands
 
-    def send_gcode_commands(self, commands, delay=0.1):
-        """Send multiple G-code commands sequentially with delay to prevent buffer overflow"""
-        if not self.serial_conn:
+    def send_gcode_commands(self, commands):
+        """Send a G-code block (e.g. G91 / G1 / G90) to GRBL in a single write
+
+        The block is far smaller than GRBL's 128-byte serial RX buffer, so the
+        lines don't need to be paced with sleeps between them.
+        """
+        if not self.serial_conn or not commands:
             return
 
-        for cmd in commands:
-            try:
-                self.send_serial_command(cmd, log=True)
-                time.sleep(delay)  # Increased delay to prevent timeout
-            except Exception as e:
-                # Log but continue with remaining commands
-                if "timeout" not in str(e).lower():
-                    self.log_info(f"Command error (continuing): {e}")
+        self.send_serial_command("".join(commands), log=True)
 
     def on_speed_change(self, value):
         """Update speed label"""
@@ -1190,10 +1231,7 @@ class ScannerGUI:
         """Update step label"""
         step = max(0.1, float(value))
         self.step_var.set(step)
-        if isinstance(step, float) and step.is_integer():
-            self.step_label.config(text=f"{int(step)}")
-        else:
-            self.step_label.config(text=f"{step:.1f}")
+        self.step_label.config(text=_fmt(step, 1))
 
     def calculate_one_revolution_distance(self):
         """Calculate exact distance for 1 full revolution
@@ -1242,13 +1280,48 @@ class ScannerGUI:
             x_move = -step * 0.707
             z_move = -step * 0.707
 
-        if x_move != 0 or z_move != 0:
-            commands = self.format_gcode_command(x_move=x_move, z_move=z_move, feed_rate=speed)
+        # format_gcode_command has no word for z_move, so only the rotation part is sent
+        if x_move != 0:
+            self._queue_jog('x', x_move, speed)
 
-            if self.serial_conn:
-                self.send_gcode_commands(commands, delay=0.05)
-                cmd_str = " ".join([c.strip() for c in commands])
-                self.log_info(f"Moving {direction}: {cmd_str}")
+    def _queue_jog(self, axis, move, feed_rate):
+        """Add a jog click to the pending move ('x' rotation, 'y' height in mm)
+
+        Clicks on the same axis at the same feed rate are summed; each one re-arms a
+        50ms timer, so a burst is sent by _flush_jog as one relative move once the
+        clicks pause. A click on another axis or at another feed rate sends the
+        pending move first, so it keeps its own motion.
+        """
+        if self._jog_after_id is not None:
+            self.root.after_cancel(self._jog_after_id)
+            self._jog_after_id = None
+        pending = self._pending_jog
+        if pending is not None and pending[0] == axis and pending[2] == feed_rate:
+            self._pending_jog = (axis, pending[1] + move, feed_rate)
+        else:
+            if pending is not None:
+                self._flush_jog()
+            self._pending_jog = (axis, move, feed_rate)
+        self._jog_after_id = self.root.after(50, self._flush_jog)
+
+    def _flush_jog(self):
+        """Send the jog burst accumulated by _queue_jog as one G91 / G1 / G90 block"""
+        axis, move, feed_rate = self._pending_jog
+        self._pending_jog = None
+        self._jog_after_id = None
+        if not self.is_connected or not self.serial_conn:
+            return
+
+        if axis == 'x':
+            commands = self.format_gcode_command(x_move=move, feed_rate=feed_rate)
+        else:
+            commands = self.format_gcode_command(y_move=move, feed_rate=feed_rate)
+        if not commands:
+            return  # Opposite clicks cancelled out
+        self.send_gcode_commands(commands)
+        if self.log_jog_commands:
+            cmd_str = " ".join([c.strip() for c in commands])
+            self.log_info(f"Jog: {cmd_str}")
 
     def go_home_test(self):
         """Go to home position"""
@@ -1256,7 +1329,7 @@ class ScannerGUI:
             return
 
         if self.serial_conn:
-            self.send_serial_command("G28\n", log=True)
+            self.send_serial_command(_CMD_HOME, log=True)
             self.current_x_pos = 0.0
             self.current_y_pos = 0.0
             self.current_z_pos = 0.0
@@ -1264,16 +1337,17 @@ class ScannerGUI:
             self.update_test_position_display()
             self.log_info("Going to home (G28)")
 
+    def _on_vl53_offset_changed(self, *args):
+        """Parse the offset entry once per edit instead of on every reading (invalid = no offset)"""
+        try:
+            self._vl53_offset = float(self.vl53_offset_var.get())
+        except ValueError:
+            self._vl53_offset = 0.0
+
     def on_sensor_type_changed(self, event=None):
         """Handle sensor type change"""
+        # The poll picks up the new type on its next tick
         self.vl53_sensor_type = self.vl53_sensor_type_var.get()
-        if self.vl53_reading_active:
-            # Restart reading with new sensor type
-            self.vl53_reading_active = False
-            time.sleep(0.1)
-            self.vl53_reading_active = True
-            reading_thread = threading.Thread(target=self.continuous_vl53_read, daemon=True)
-            reading_thread.start()
 
     def toggle_vl53_reading(self):
         """Toggle VL53L0X/VL53L1 reading"""
@@ -1286,32 +1360,24 @@ class ScannerGUI:
         if not self.vl53_reading_active:
             self.vl53_reading_active = True
             self.vl53_read_btn.config(text="Stop Reading")
-            self.vl53_status_var.set(f"Reading {self.vl53_sensor_type}...")
+            self.vl53_status_label.config(text=f"Reading {self.vl53_sensor_type}...")
 
-            reading_thread = threading.Thread(target=self.continuous_vl53_read, daemon=True)
-            reading_thread.start()
+            if self._vl53_poll_job is None:
+                self._vl53_poll_job = self.root.after(0, self._poll_vl53)
         else:
             self.vl53_reading_active = False
             self.vl53_read_btn.config(text="Start Reading")
-            self.vl53_status_var.set("Stopped")
+            self.vl53_status_label.config(text="Stopped")
 
-    def continuous_vl53_read(self):
-        """Continuously read from VL53L0X or VL53L1"""
-        while self.vl53_reading_active and self.is_connected:
-            try:
-                if self.serial_conn:
-                    # Get current sensor type from UI
-                    current_type = self.vl53_sensor_type_var.get()
-                    # Use sensor type to determine command
-                    if current_type == "VL53L1":
-                        self.send_serial_command("READ_VL53L1\n", log=True)
-                    else:
-                        self.send_serial_command("READ_VL53L0X\n", log=True)
-                time.sleep(0.2)
-            except Exception as e:
-                if self.vl53_reading_active:
-                    self.vl53_status_var.set(f"Error: {str(e)}")
-                break
+    def _poll_vl53(self):
+        """Request one VL53 reading every 200ms while reading is active (Tk main thread)"""
+        if not (self.vl53_reading_active and self.is_connected and self.serial_conn):
+            self._vl53_poll_job = None
+            return
+
+        self.send_serial_command(_CMD_READ_VL53[self.vl53_sensor_type], log=True)
+
+        self._vl53_poll_job = self.root.after(200, self._poll_vl53)
 
     def rotate_x_cw_test(self):
         """Rotate X clockwise"""
@@ -1321,11 +1387,7 @@ class ScannerGUI:
         step = max(0.1, float(self.step_var.get()))
         speed = max(1, float(self.speed_var.get()))
 
-        commands = self.format_gcode_command(x_move=step, feed_rate=speed)
-        if self.serial_conn:
-            self.send_gcode_commands(commands, delay=0.05)
-            cmd_str = " ".join([c.strip() for c in commands])
-            self.log_info(f"X CW: {cmd_str}")
+        self._queue_jog('x', step, speed)
 
     def rotate_x_ccw_test(self):
         """Rotate X counter-clockwise"""
@@ -1335,11 +1397,7 @@ class ScannerGUI:
         step = max(0.1, float(self.step_var.get()))
         speed = max(1, float(self.speed_var.get()))
 
-        commands = self.format_gcode_command(x_move=-step, feed_rate=speed)
-        if self.serial_conn:
-            self.send_gcode_commands(commands, delay=0.05)
-            cmd_str = " ".join([c.strip() for c in commands])
-            self.log_info(f"X CCW: {cmd_str}")
+        self._queue_jog('x', -step, speed)
 
     def rotate_x_full_cw_test(self):
         """Rotate X 360° clockwise"""
@@ -1351,9 +1409,10 @@ class ScannerGUI:
 
         commands = self.format_gcode_command(x_move=distance, feed_rate=speed)
         if self.serial_conn:
-            self.send_gcode_commands(commands, delay=0.05)
-            cmd_str = " ".join([c.strip() for c in commands])
-            self.log_info(f"X 360° CW (3.6mm): {cmd_str}")
+            self.send_gcode_commands(commands)
+            if self.log_jog_commands:
+                cmd_str = " ".join([c.strip() for c in commands])
+                self.log_info(f"X 360° CW (3.6mm): {cmd_str}")
 
     def rotate_x_full_ccw_test(self):
         """Rotate X 360° counter-clockwise"""
@@ -1365,9 +1424,10 @@ class ScannerGUI:
 
         commands = self.format_gcode_command(x_move=-distance, feed_rate=speed)
         if self.serial_conn:
-            self.send_gcode_commands(commands, delay=0.05)
-            cmd_str = " ".join([c.strip() for c in commands])
-            self.log_info(f"X 360° CCW (-3.6mm): {cmd_str}")
+            self.send_gcode_commands(commands)
+            if self.log_jog_commands:
+                cmd_str = " ".join([c.strip() for c in commands])
+                self.log_info(f"X 360° CCW (-3.6mm): {cmd_str}")
 
     def rotate_y_cw_test(self):
         """Move Z up (mapped from GRBL Y)"""
@@ -1377,11 +1437,7 @@ class ScannerGUI:
         step = max(0.1, float(self.step_var.get()))
         speed = max(1, float(self.speed_var.get()))
 
-        commands = self.format_gcode_command(y_move=step, feed_rate=speed)
-        if self.serial_conn:
-            self.send_gcode_commands(commands, delay=0.05)
-            cmd_str = " ".join([c.strip() for c in commands])
-            self.log_info(f"Z Lên: {cmd_str}")
+        self._queue_jog('y', step, speed)
 
     def rotate_y_ccw_test(self):
         """Move Z down (mapped from GRBL Y)"""
@@ -1391,11 +1447,7 @@ class ScannerGUI:
         step = max(0.1, float(self.step_var.get()))
         speed = max(1, float(self.speed_var.get()))
 
-        commands = self.format_gcode_command(y_move=-step, feed_rate=speed)
-        if self.serial_conn:
-            self.send_gcode_commands(commands, delay=0.05)
-            cmd_str = " ".join([c.strip() for c in commands])
-            self.log_info(f"Z Xuống: {cmd_str}")
+        self._queue_jog('y', -step, speed)
 
     def rotate_y_full_cw_test(self):
         """Move Z full up"""
@@ -1407,9 +1459,10 @@ class ScannerGUI:
 
         commands = self.format_gcode_command(y_move=z_travel, feed_rate=speed)
         if self.serial_conn:
-            self.send_gcode_commands(commands, delay=0.05)
-            cmd_str = " ".join([c.strip() for c in commands])
-            self.log_info(f"Z Lên Hết: {cmd_str}")
+            self.send_gcode_commands(commands)
+            if self.log_jog_commands:
+                cmd_str = " ".join([c.strip() for c in commands])
+                self.log_info(f"Z Lên Hết: {cmd_str}")
 
     def rotate_y_full_ccw_test(self):
         """Move Z full down"""
@@ -1421,9 +1474,10 @@ class ScannerGUI:
 
         commands = self.format_gcode_command(y_move=-z_travel, feed_rate=speed)
         if self.serial_conn:
-            self.send_gcode_commands(commands, delay=0.05)
-            cmd_str = " ".join([c.strip() for c in commands])
-            self.log_info(f"Z Xuống Hết: {cmd_str}")
+            self.send_gcode_commands(commands)
+            if self.log_jog_commands:
+                cmd_str = " ".join([c.strip() for c in commands])
+                self.log_info(f"Z Xuống Hết: {cmd_str}")
 
     def toggle_z_layer_test(self):
         """Toggle Z layer test - chỉ chạy Z và đo khoảng cách ở mỗi lớp"""
@@ -1437,6 +1491,7 @@ class ScannerGUI:
             self.z_layer_test_data = []
             
             # Clear results
+            self._z_test_pending.clear()
             if hasattr(self, 'z_test_results_text'):
                 self.z_test_results_text.delete('1.0', tk.END)
                 self.z_test_results_text.insert(tk.END, "Bắt đầu test Z...\n")
@@ -1450,8 +1505,8 @@ class ScannerGUI:
             # Stop test
             self.z_layer_test_active = False
             self.z_test_btn.config(text="Bắt đầu Test Z")
-            if hasattr(self, 'z_test_results_text'):
-                self.z_test_results_text.insert(tk.END, "\nTest đã dừng.\n")
+            # Queued behind any results the test thread has not shown yet
+            self._z_test_pending.append("\nTest đã dừng.\n")
 
     def z_layer_test_loop(self):
         """Z layer test loop - di chuyển Z qua các lớp và đo khoảng cách"""
@@ -1475,94 +1530,53 @@ class ScannerGUI:
             
             self.log_info(f"Bắt đầu Z layer test: {num_layers} lớp, mỗi lớp {layer_height_mm}mm")
             
-            # Start from current position
-            start_z = self.current_y_pos
-            
+            # Each layer after the first is one write: move up, G4 P0 (GRBL waits for the
+            # motor to stop) and the sensor read, so the next request goes out as soon as the
+            # previous reading is parsed instead of after fixed sleeps
+            move_commands = self.format_gcode_command(y_move=layer_height_mm, feed_rate=speed)
+            read_cmd = _CMD_READ_VL53[current_type]
+            step_block = ("".join(move_commands) + "G4 P0\n").encode() + read_cmd
+            # Twice the nominal move time at the feed rate (GRBL Y = mm / 10), plus the reading
+            step_timeout = (layer_height_mm / 10.0) / speed * 60.0 * 2 + 2.0 + 1.0
+
             for layer in range(num_layers):
-                if not self.z_layer_test_active:
+                if not self.z_layer_test_active or not self.serial_conn:
                     break
-                
-                # Get current Z position
-                current_z = self.current_y_pos
-                
-                # Clear old sensor data
+
+                # Clear old sensor data; the reader thread keeps draining the port
                 self.current_vl53_distance = None
-                
-                # Clear serial input buffer more carefully to prevent losing sensor data
-                if self.serial_conn:
-                    try:
-                        # Read any pending data first (this is safer than reset)
-                        max_flush_attempts = 5
-                        for _ in range(max_flush_attempts):
-                            if self.serial_conn.in_waiting > 0:
-                                # Read and discard pending data
-                                self.serial_conn.read(self.serial_conn.in_waiting)
-                                time.sleep(0.05)  # Small delay to let more data arrive if any
-                            else:
-                                break
-                        # Small delay after flushing to ensure buffer is clear
-                        time.sleep(0.1)
-                    except:
-                        pass
-                
-                # Read sensor
+                self._vl53_event.clear()
+
+                # Read sensor (the first layer is read where the carriage stands)
                 try:
-                    if self.serial_conn:
-                        if current_type == "VL53L1":
-                            self.send_serial_command("READ_VL53L1\n", log=False)
-                        else:
-                            self.send_serial_command("READ_VL53L0X\n", log=False)
-                        
-                        # Small delay after sending command to ensure it's sent
-                        time.sleep(0.1)
-                    
-                    # Wait for sensor reading (increased to 1.5s to handle buffer delays)
-                    wait_start = time.time()
+                    self.send_serial_command(read_cmd if layer == 0 else step_block, log=False)
+                    # update_vl53_display only stores valid readings
                     sensor_data_received = False
-                    while time.time() - wait_start < 1.5:
-                        if self.current_vl53_distance is not None:
-                            if self.current_vl53_distance > 0 and self.current_vl53_distance < 8190:
-                                sensor_data_received = True
-                                break
-                        time.sleep(0.05)
-                    
-                    if sensor_data_received:
+                    if self._vl53_event.wait(1.5 if layer == 0 else step_timeout):
                         distance = self.current_vl53_distance
+                        sensor_data_received = distance is not None and 0 < distance < 8190
+
+                    # The carriage is stopped: one status report gives the height of this layer
+                    self._pos_event.clear()
+                    self.send_serial_command(_CMD_STATUS, log=False)
+                    self._pos_event.wait(0.15)
+                    current_z = self.current_y_pos
+
+                    if sensor_data_received:
                         # Store data
                         self.z_layer_test_data.append((current_z, distance))
                         
                         # Update results display
                         result_text = f"Z={current_z:6.2f}mm → Distance={distance:6.1f}mm\n"
-                        if hasattr(self, 'z_test_results_text'):
-                            self.root.after(0, lambda txt=result_text: self.z_test_results_text.insert(tk.END, txt))
-                            self.root.after(0, lambda: self.z_test_results_text.see(tk.END))
+                        self._z_test_pending.append(result_text)
                         
                         self.log_info(f"Layer {layer+1}/{num_layers}: Z={current_z:.2f}mm, Distance={distance:.1f}mm")
                     else:
                         result_text = f"Z={current_z:6.2f}mm → ERROR (No data)\n"
-                        if hasattr(self, 'z_test_results_text'):
-                            self.root.after(0, lambda txt=result_text: self.z_test_results_text.insert(tk.END, txt))
+                        self._z_test_pending.append(result_text)
                         self.log_info(f"Layer {layer+1}/{num_layers}: Z={current_z:.2f}mm - No sensor data")
                 except Exception as e:
                     self.log_info(f"Error reading sensor at layer {layer+1}: {e}")
-                
-                if not self.z_layer_test_active:
-                    break
-                
-                # Move Z up by layer height (except for last layer)
-                if layer < num_layers - 1:
-                    commands = self.format_gcode_command(y_move=layer_height_mm, feed_rate=speed)
-                    if self.serial_conn:
-                        self.send_gcode_commands(commands, delay=0.1)
-                        # Wait for movement to complete
-                        time.sleep(0.5)
-                        
-                        # Wait for Z position to update
-                        wait_start = time.time()
-                        while time.time() - wait_start < 2.0:
-                            if abs(self.current_y_pos - current_z) >= layer_height_mm * 0.5:
-                                break
-                            time.sleep(0.1)
             
             # Test complete
             self.z_layer_test_active = False
@@ -1584,101 +1598,147 @@ class ScannerGUI:
                         summary += "⚠ Cảnh báo: Chênh lệch lớn (>5mm) - có thể bị lệch tâm!\n"
                     else:
                         summary += "✓ Khoảng cách ổn định - cảm biến có vẻ đúng tâm\n"
-                self.root.after(0, lambda txt=summary: self.z_test_results_text.insert(tk.END, txt))
+                self._z_test_pending.append(summary)
             
             self.log_info("Z layer test hoàn thành")
             
         except Exception as e:
             self.log_info(f"Z layer test error: {e}")
-            import traceback
             traceback.print_exc()
         finally:
             self.z_layer_test_active = False
             if hasattr(self, 'z_test_btn'):
                 self.root.after(0, lambda: self.z_test_btn.config(text="Bắt đầu Test Z"))
 
-    def calculate_point_from_scan(self, angle_deg, distance_mm, z_height_mm):
-        """Calculate 3D point from scan data
-        angle_deg: rotation angle in degrees
-        distance_mm: distance from sensor in mm
-        z_height_mm: height in mm
-        Returns: (x, y, z) in mm or None if filtered out
+    def calculate_points_from_scan(self, angles_deg, distances_mm, heights_mm):
+        """Calculate 3D points from a batch of scan samples
+        angles_deg: rotation angles in degrees
+        distances_mm: distances from sensor in mm
+        heights_mm: heights in mm
+        Returns: (N, 5) float32 array of (x, y, z, angle, height) in mm, filtered samples removed
         """
-        try:
-            center_distance_cm = float(self.center_distance_var.get())
-            disk_radius_cm = float(self.disk_radius_var.get())
-
-            # Convert distance from mm to cm for calculation
-            distance_cm = distance_mm / 10.0
-
-            # Filter 1: Remove negative or zero distances (error readings)
-            if distance_cm <= 0:
-                self.log_info(f"⚠ Filtered point at {angle_deg:.1f}°: Invalid distance ({distance_mm:.1f}mm)")
-                return None
-
-            # Filter 2: Calculate valid range
-            # Cảm biến ở bên cạnh, cách tâm center_distance_cm
-            # Bán kính đĩa disk_radius_cm
-            # Khoảng cách tối thiểu: center - radius = 15 - 5 = 10cm
-            # Khoảng cách tối đa: center + radius = 15 + 5 = 20cm
-            min_distance_cm = center_distance_cm - disk_radius_cm  # 10cm
-            max_distance_cm = center_distance_cm + disk_radius_cm  # 20cm
-
-            # Filter 3: Remove values outside valid range
-            if distance_cm < min_distance_cm or distance_cm > max_distance_cm:
-                self.log_info(f"⚠ Filtered point at {angle_deg:.1f}°: Out of range ({distance_mm:.1f}mm, valid: {min_distance_cm*10:.1f}-{max_distance_cm*10:.1f}mm)")
-                return None  # Out of range, skip this point
-
-            # Calculate radius from center
-            # Logic from MATLAB: r = centerDistance - distance
-            # This gives radius from turntable center to object surface
-            radius_from_center = center_distance_cm - distance_cm
-
-            # Filter 4: Remove values around 0 (midThresh in MATLAB)
-            # Tắt filter này vì với hình trụ, radius gần 0 là bình thường
-            # Chỉ filter các giá trị rất gần 0 (có thể là noise)
-            # mid_thresh_upper = 0.2  # Disabled - allow points near center
-            # mid_thresh_lower = -0.2  # Disabled - allow points near center
-            # if mid_thresh_lower < radius_from_center < mid_thresh_upper:
-            #     self.log_info(f"⚠ Filtered point at {angle_deg:.1f}°: Too close to center (radius={radius_from_center:.2f}cm)")
-            #     return None  # Too close to center, likely error
-
-            # Convert angle to radians
-            angle_rad = np.radians(angle_deg)
-
-            # Calculate x, y in cm (cylindrical coordinates), then convert to mm
-            x_cm = radius_from_center * np.cos(angle_rad)
-            y_cm = radius_from_center * np.sin(angle_rad)
-            x_mm = x_cm * 10.0  # Convert cm to mm for display
-            y_mm = y_cm * 10.0  # Convert cm to mm for display
-
-            # Z height: keep in mm (no conversion needed)
-            z_mm = z_height_mm
-
-            return (x_mm, y_mm, z_mm)
-        except Exception as e:
-            self.log_info(f"Error calculating point: {e}")
-            return None
+        # Parsed from the geometry entries when the scan started (see start_scan_up)
+        center_distance_cm, disk_radius_cm = self._scan_geometry
+
+        # float32 like the scan buffers (no copy for columns of _rev_buf); ample for mm precision
+        angles_deg = np.asarray(angles_deg, dtype=np.float32)
+        heights_mm = np.asarray(heights_mm, dtype=np.float32)
+
+        # Convert distance from mm to cm for calculation
+        distance_cm = np.asarray(distances_mm, dtype=np.float32) / np.float32(10.0)
+
+        # Filter 1: Remove negative or zero distances (error readings)
+        keep = distance_cm > 0
+        if not keep.all():
+            self.log_info(f"⚠ Filtered {np.count_nonzero(~keep)} point(s): Invalid distance")
+
+        # Filter 2: Calculate valid range
+        # Cảm biến ở bên cạnh, cách tâm center_distance_cm
+        # Bán kính đĩa disk_radius_cm
+        # Khoảng cách tối thiểu: center - radius = 15 - 5 = 10cm
+        # Khoảng cách tối đa: center + radius = 15 + 5 = 20cm
+        min_distance_cm = center_distance_cm - disk_radius_cm  # 10cm
+        max_distance_cm = center_distance_cm + disk_radius_cm  # 20cm
+
+        # Filter 3: Remove values outside valid range
+        in_range = (distance_cm >= min_distance_cm) & (distance_cm <= max_distance_cm)
+        if not in_range[keep].all():
+            self.log_info(f"⚠ Filtered {np.count_nonzero(keep & ~in_range)} point(s): Out of range "
+                          f"(valid: {min_distance_cm*10:.1f}-{max_distance_cm*10:.1f}mm)")
+        keep &= in_range
+
+        # Calculate radius from center
+        # Logic from MATLAB: r = centerDistance - distance
+        # This gives radius from turntable center to object surface
+        radius_from_center = center_distance_cm - distance_cm[keep]
+
+        # Filter 4 (midThresh in MATLAB) stays disabled: with a cylinder, a radius
+        # near 0 is normal, so points near the center are kept
+
+        # Angle to its index on the 0.1° grid (see _COS_TABLE)
+        angle_idx = np.rint(angles_deg[keep] * 10).astype(np.intp) % _ANGLE_GRID
+
+        # Calculate x, y in cm (cylindrical coordinates), then convert to mm for display
+        points = np.empty((len(radius_from_center), 5), dtype=np.float32)
+        points[:, 0] = radius_from_center * _COS_TABLE[angle_idx] * 10.0
+        points[:, 1] = radius_from_center * _SIN_TABLE[angle_idx] * 10.0
+        # Z height: keep in mm (no conversion needed)
+        points[:, 2] = heights_mm[keep]
+        points[:, 3] = angles_deg[keep]
+        points[:, 4] = heights_mm[keep]
+        return points
+
+    @property
+    def scan_data(self):
+        """Collected scan points as an (N, 5) float32 view of (x, y, z, angle, height)"""
+        return self._scan_buf[:self._scan_n]
+
+    def count_layer_points(self, height):
+        """Count scan points within 0.1mm of the given height"""
+        return int(np.count_nonzero(np.abs(self.scan_data[:, 4] - height) < 0.1))
 
     def process_scan_data_point(self):
-        """Process current position and sensor reading to create scan point"""
+        """Record the current position and sensor reading as a raw scan sample
+
+        Samples are converted to 3D points a revolution at a time by _flush_revolution.
+        """
         if self.current_vl53_distance is None:
             return
-        
+
         # Get current angle and height
         angle = self.current_angle
         z_height = self.current_y_pos  # Height from GRBL Y
-        
-        # Calculate 3D point
-        point = self.calculate_point_from_scan(angle, self.current_vl53_distance, z_height)
-        if point:
-            # Store point with angle and height for later connection
-            # Format: (x, y, z, angle, height)
-            point_with_meta = point + (angle, z_height)
-            self.scan_data.append(point_with_meta)
-            # Update visualization in main thread (thread-safe)
-            self.root.after(0, self.update_visualization)
-            self.log_info(f"Point added: angle={angle:.1f}°, dist={self.current_vl53_distance:.1f}mm, z={z_height:.1f}mm, point=({point[0]:.1f}, {point[1]:.1f}, {point[2]:.1f})mm")
+        if self._rev_n == len(self._rev_buf):
+            grown = np.empty((2 * self._rev_n, 3), dtype=np.float32)
+            grown[:self._rev_n] = self._rev_buf
+            self._rev_buf = grown
+        self._rev_buf[self._rev_n] = (angle, self.current_vl53_distance, z_height)
+        self._rev_n += 1
+        self.log_info(f"Sample added: angle={angle:.1f}°, dist={self.current_vl53_distance:.1f}mm, z={z_height:.1f}mm")
+
+    def _append_scan_points(self, points):
+        """Append (N, 5) rows to the scan buffer, doubling its capacity when full"""
+        needed = self._scan_n + len(points)
+        if needed > len(self._scan_buf):
+            capacity = len(self._scan_buf)
+            while capacity < needed:
+                capacity *= 2
+            # Copy only the filled rows (np.resize would also tile them into the new space)
+            grown = np.empty((capacity, 5), dtype=np.float32)
+            grown[:self._scan_n] = self._scan_buf[:self._scan_n]
+            self._scan_buf = grown
+        self._scan_buf[self._scan_n:needed] = points
+        self._scan_n = needed
+
+    def _flush_revolution(self):
+        """Convert the buffered samples of one revolution to 3D points and store them"""
+        if self._rev_n == 0:
+            return
+        samples = self._rev_buf[:self._rev_n]
+        self._rev_n = 0
+
+        # Whole columns at once: one cos/sin pass per revolution
+        points = self.calculate_points_from_scan(samples[:, 0], samples[:, 1], samples[:, 2])
+        n = len(points)
+        if n == 0:
+            return
+
+        # Store points with angle and height for later connection
+        self._append_scan_points(points)
+        # Redrawn by _viz_tick on the main thread
+        self._viz_dirty = True
+        self.log_info(f"Points added: {n} (total {self._scan_n})")
+
+    def wait_for_idle(self, moved, timeout):
+        """Poll GRBL status until it reports Idle and moved() is true; False on timeout"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline and self.is_connected:
+            self._pos_event.clear()
+            self.send_serial_command(_CMD_STATUS, log=False)
+            self._pos_event.wait(0.1)  # Returns as soon as the report is parsed
+            if self.grbl_state == "Idle" and moved():
+                return True
+        return False
 
     def scan_rotation_loop(self):
         """Main scan loop: rotate X continuously, read sensor, move Z up after each rotation"""
@@ -1708,6 +1768,8 @@ class ScannerGUI:
             
             # Calculate angle step per point
             angle_step = 360.0 / points_per_rev
+            # Smallest angle change that counts as a completed step: 20% of the step, at least 1 degree
+            min_change = max(angle_step * 0.2, 1.0)
             
             # Calculate one revolution distance (3.6mm for 360 degrees)
             one_rev_distance = self.calculate_one_revolution_distance()
@@ -1735,6 +1797,21 @@ class ScannerGUI:
             
             self.log_info(f"Scan sẽ chạy từ Z={start_z_position:.2f}mm đến Z={start_z_position + max_height:.2f}mm ({estimated_total_layers} lớp)")
 
+            # The rotation step and the layer move are the same for the whole scan: format them once
+            # Note: format_gcode_command maps x_move to GRBL X (rotation) and y_move to GRBL Y (height)
+            move_commands = self.format_gcode_command(x_move=step_distance_mm, feed_rate=speed)
+            move_cmd_str = " ".join([c.strip() for c in move_commands])
+            # The step block (move + dwell + read) is the same for every point: encode it once
+            # per sensor type and send the cached bytes each step
+            step_blocks = {sensor: ("".join(move_commands) + "G4 P0\n").encode() + read_cmd
+                           for sensor, read_cmd in _CMD_READ_VL53.items()}
+            z_commands = self.format_gcode_command(y_move=layer_height_mm, feed_rate=speed)
+            z_cmd_str = " ".join([c.strip() for c in z_commands])
+            # Upper bound for one layer move: twice its nominal time at the feed rate (GRBL Y = mm / 10)
+            z_move_timeout = (layer_height_mm / 10.0) / speed * 60.0 * 2 + 2.0
+            # Same bound for one rotation step, plus 1.0s for the sensor reading queued behind it
+            step_timeout = step_distance_mm / speed * 60.0 * 2 + 2.0 + 1.0
+
             while self.is_scanning and not self.scan_paused:
                 # Record starting position
                 start_z = self.current_y_pos
@@ -1747,11 +1824,11 @@ class ScannerGUI:
                     break
                 
                 # Count points in current layer (points with same height as start_z)
-                points_in_current_layer = sum(1 for p in self.scan_data 
-                                            if len(p) >= 5 and abs(p[4] - start_z) < 0.1)
+                points_in_current_layer = self.count_layer_points(start_z)
 
                 # Update window title with layer info
-                self.root.title(f"3D Scanner Control - Layer {layer_number}/{estimated_total_layers} at Z={start_z:.2f}mm - Points: {points_in_current_layer}")
+                title = f"3D Scanner Control - Layer {layer_number}/{estimated_total_layers} at Z={start_z:.2f}mm - Points: {points_in_current_layer}"
+                self._post_ui('title', lambda t=title: self.root.title(t))
                 
                 self.log_info(f"=== Layer {layer_number}/{estimated_total_layers} at Z={start_z:.2f}mm - Current points: {points_in_current_layer} ===")
 
@@ -1766,116 +1843,46 @@ class ScannerGUI:
                     current_angle_before = self.current_angle
                     self.log_info(f"Point {point_num + 1}/{points_per_rev}: Rotating {angle_step:.1f}° from {current_angle_before:.1f}°")
 
-                    # Send movement command (x_move for rotation axis)
-                    # Note: format_gcode_command maps x_move to GRBL X (rotation)
-                    move_commands = self.format_gcode_command(x_move=step_distance_mm, feed_rate=speed)
-                    # Log the actual command being sent
-                    cmd_str = " ".join([c.strip() for c in move_commands])
-                    self.log_info(f"→ Sending G-code: {cmd_str}")
+                    # Steps 2-3 are queued with the move in one write: G4 P0 makes GRBL wait until
+                    # the planner is empty (motor stopped) before it runs the next line, so the
+                    # sensor is read on a stationary table without polling status in between
+                    # Sensor type is kept in sync with the UI by on_sensor_type_changed
+                    sensor_type = self.vl53_sensor_type
+
+                    # Clear old sensor data to ensure we get FRESH reading
+                    self.current_vl53_distance = None
+                    self._vl53_event.clear()
+                    self.log_info(f"→ Sending G-code: {move_cmd_str} G4P0 READ_{sensor_type}")
                     if self.serial_conn:
-                        self.send_gcode_commands(move_commands, delay=0.1)
+                        self.send_serial_command(step_blocks[sensor_type], log=True)
 
-                    # Step 2: Wait for motor to complete movement and request status report
-                    # Wait at least 0.5s for movement to complete
-                    time.sleep(0.5)
-                    
-                    # Request status report to get updated position
-                    # GRBL only sends status when requested with "?" or when in certain states
+                    # Step 3: Motor is now STOPPED - single sensor reading, no retry
+                    # Wait for the reading, which GRBL only runs once the move has finished
+                    # update_vl53_display only stores valid readings, so a reading
+                    # that leaves current_vl53_distance at None was invalid: skip the point
+                    sensor_data_received = False
+                    if self._vl53_event.wait(step_timeout):
+                        distance = self.current_vl53_distance
+                        sensor_data_received = distance is not None and 0 < distance < 8190
+
+                    # The table stays still until the next step is sent: one status report
+                    # gives the angle the reading was taken at
                     if self.serial_conn:
-                        # Request status report multiple times to ensure we get the update
-                        for status_request in range(3):
-                            self.send_serial_command("?\n", log=False)
-                            time.sleep(0.2)  # Wait for status report to arrive
-
-                    # Verify angle has changed by checking status reports
-                    movement_timeout = time.time() + 3.0  # Max 3s for movement verification
-                    angle_moved = False
-                    last_angle_check = current_angle_before
-                    
-                    while time.time() < movement_timeout:
-                        # Request status report again if needed
-                        if self.serial_conn and not angle_moved:
-                            self.send_serial_command("?\n", log=False)
-                            time.sleep(0.15)  # Wait for response
-                        
-                        current_angle_after = self.current_angle
-                        angle_diff = abs(current_angle_after - current_angle_before)
-                        if angle_diff > 180:
-                            angle_diff = 360 - angle_diff
-
-                        # Check if angle changed (at least 20% of expected movement, or any change if small step)
-                        min_change = max(angle_step * 0.2, 1.0)  # At least 1 degree or 20% of step
-                        if angle_diff >= min_change:
-                            angle_moved = True
-                            self.log_info(f"✓ Angle updated: {current_angle_before:.1f}° → {current_angle_after:.1f}° (diff: {angle_diff:.1f}°)")
-                            break
-                        
-                        # If angle changed at all (even small), consider it progress
-                        if abs(current_angle_after - last_angle_check) > 0.1:
-                            last_angle_check = current_angle_after
-                            # Continue waiting for full movement
-                        
-                        time.sleep(0.1)
+                        self._pos_event.clear()
+                        self.send_serial_command(_CMD_STATUS, log=False)
+                        self._pos_event.wait(0.15)  # Returns as soon as the report is parsed
 
-                    if not angle_moved:
+                    angle_diff = abs(self.current_angle - current_angle_before)
+                    if angle_diff > 180:
+                        angle_diff = 360 - angle_diff
+                    if angle_diff >= min_change:
+                        self.log_info(f"✓ Angle updated: {current_angle_before:.1f}° → {self.current_angle:.1f}° (diff: {angle_diff:.1f}°)")
+                    else:
                         self.log_info(f"⚠ Warning: Angle did not change significantly after movement command (still at {self.current_angle:.1f}°)")
-                        # Try one more status request
-                        if self.serial_conn:
-                            self.send_serial_command("?\n", log=False)
-                            time.sleep(0.3)
-                            self.log_info(f"   After retry: angle = {self.current_angle:.1f}°")
 
-                    # Step 3: Motor is now STOPPED - Read sensor (single attempt, no retry)
-                    # Clear old sensor data to ensure we get FRESH reading
-                    self.current_vl53_distance = None
-                    
-                    # Clear serial input buffer before reading sensor
-                    if self.serial_conn:
-                        try:
-                            # Clear all pending data in buffer
-                            if self.serial_conn.in_waiting > 0:
-                                self.serial_conn.reset_input_buffer()
-                            time.sleep(0.05)  # Small delay after clearing
-                        except:
-                            pass
-                    
-                    # Single attempt to read sensor - if invalid, skip this point
                     try:
-                        if self.serial_conn:
-                            # Get current sensor type from UI
-                            current_type = self.vl53_sensor_type_var.get() if hasattr(self, 'vl53_sensor_type_var') else self.vl53_sensor_type
-                            # Use sensor type to determine command
-                            if current_type == "VL53L1":
-                                self.send_serial_command("READ_VL53L1\n", log=False)
-                            else:
-                                self.send_serial_command("READ_VL53L0X\n", log=False)
-                            
-                            # Small delay after sending command to ensure it's sent
-                            time.sleep(0.1)
-
-                        # Wait for sensor reading (normal wait time: 1.0s)
-                        wait_start = time.time()
-                        sensor_data_received = False
-                        while time.time() - wait_start < 1.0:
-                            if self.current_vl53_distance is not None:
-                                # Got data - check if valid
-                                if self.current_vl53_distance > 0 and self.current_vl53_distance < 8190:
-                                    sensor_data_received = True
-                                    break
-                                else:
-                                    # Invalid data, skip this point
-                                    break
-                            time.sleep(0.05)
-                        
-                        # If no data received, clear buffer and continue to next point
+                        # If no data received, continue to next point
                         if not sensor_data_received:
-                            # Clear buffer to remove any stale data
-                            if self.serial_conn:
-                                try:
-                                    if self.serial_conn.in_waiting > 0:
-                                        self.serial_conn.reset_input_buffer()
-                                except:
-                                    pass
                             self.current_vl53_distance = None  # Clear sensor data
 
                         # Step 4: Process point only if we have valid data
@@ -1883,13 +1890,13 @@ class ScannerGUI:
                             self.process_scan_data_point()
                             points_collected += 1
                             
-                            # Count current points in this layer
+                            # Count current points in this layer (including samples not yet converted)
                             current_z = self.current_y_pos
-                            points_in_layer = sum(1 for p in self.scan_data 
-                                                if len(p) >= 5 and abs(p[4] - current_z) < 0.1)
+                            points_in_layer = self.count_layer_points(current_z) + self._rev_n
                             
                             # Update window title with current layer and point count
-                            self.root.title(f"3D Scanner Control - Layer {layer_number}/{estimated_total_layers} at Z={current_z:.2f}mm - Points: {points_in_layer}")
+                            title = f"3D Scanner Control - Layer {layer_number}/{estimated_total_layers} at Z={current_z:.2f}mm - Points: {points_in_layer}"
+                            self._post_ui('title', lambda t=title: self.root.title(t))
                             
                             self.log_info(f"✓ Point {points_collected}/{points_per_rev} at {self.current_angle:.1f}° - Distance: {self.current_vl53_distance}mm (Layer {layer_number}: {points_in_layer} points)")
                         else:
@@ -1898,12 +1905,15 @@ class ScannerGUI:
                         self.log_info(f"⚠ Skipped point at {self.current_angle:.1f}° - Error: {e}")
                 
                 self.log_info(f"Rotation complete. Collected {points_collected}/{points_per_rev} points")
+
+                # Convert the whole revolution in one batch
+                self._flush_revolution()
                 
                 # Update title after rotation complete
                 current_z = self.current_y_pos
-                points_in_layer = sum(1 for p in self.scan_data 
-                                    if len(p) >= 5 and abs(p[4] - current_z) < 0.1)
-                self.root.title(f"3D Scanner Control - Layer {layer_number}/{estimated_total_layers} at Z={current_z:.2f}mm - Points: {points_in_layer}")
+                points_in_layer = self.count_layer_points(current_z)
+                title = f"3D Scanner Control - Layer {layer_number}/{estimated_total_layers} at Z={current_z:.2f}mm - Points: {points_in_layer}"
+                self._post_ui('title', lambda t=title: self.root.title(t))
                 
                 if not self.is_scanning or self.scan_paused:
                     break
@@ -1920,21 +1930,19 @@ class ScannerGUI:
                 start_z_before = self.current_y_pos
                 self.log_info(f"=== Moving Z up {layer_height_mm}mm (from {start_z_before:.1f}mm) - Layer {self.current_layer + 1} ===")
                 
-                # Create command to move Z (y_move will be converted to GRBL X units)
-                # Example: y_move=2.0mm → G1 X0.2 F1 (auto-converted in format_gcode_command)
-                commands = self.format_gcode_command(y_move=layer_height_mm, feed_rate=speed)
-                
-                # Log the command for debugging
-                cmd_str = " ".join([c.strip() for c in commands])
-                self.log_info(f"Z move command: {cmd_str}")
-                print(f"[SCAN] Z move command (Layer {self.current_layer + 1}): {cmd_str}")
+                # Z move command, formatted before the loop
+                # Example: y_move=2.0mm → G1 Y0.2 F1 (auto-converted in format_gcode_command)
+                self.log_info(f"Z move command: {z_cmd_str}")
+                print(f"[SCAN] Z move command (Layer {self.current_layer + 1}): {z_cmd_str}")
                 
                 # Send commands ONCE
                 if self.serial_conn:
                     # Send commands with minimal delay
-                    self.send_gcode_commands(commands, delay=0.05)
-                    # Wait 0.5s for Z movement to complete (slow speed F1)
-                    time.sleep(0.5)
+                    self.send_gcode_commands(z_commands)
+                    # Wait for the Z move to finish: GRBL back to Idle with Z actually moved
+                    # (an Idle report from before the move started does not count)
+                    self.wait_for_idle(lambda: abs(self.current_y_pos - start_z_before) >= layer_height_mm * 0.5,
+                                       timeout=z_move_timeout)
                     
                     # Quick check if Z moved (optional verification)
                     current_z = self.current_y_pos
@@ -1950,17 +1958,19 @@ class ScannerGUI:
                 # Update progress
                 self.current_layer += 1
                 total_points = len(self.scan_data)
-                self.root.after(0, lambda: self.progress_var.set(f"Layer {self.current_layer}, Points: {total_points}"))
+                progress = f"Layer {self.current_layer}, Points: {total_points}"
+                self._post_ui('progress', lambda p=progress: self.progress_var.set(p))
                 
         except Exception as e:
             self.log_info(f"Scan error: {e}")
-            import traceback
             traceback.print_exc()
         finally:
             self.is_scanning = False
+            # Keep the samples of a revolution cut short by pause/stop
+            self._flush_revolution()
             # Update title when scan stops - show total points
             total_points = len(self.scan_data)
-            self.root.after(0, lambda: self.root.title(f"3D Scanner Control - Total Points: {total_points}"))
+            self._post_ui('title', lambda: self.root.title(f"3D Scanner Control - Total Points: {total_points}"))
             self.root.after(0, lambda: self.scan_up_btn.config(state=tk.NORMAL))
             self.root.after(0, lambda: self.scan_down_btn.config(state=tk.NORMAL))
             self.root.after(0, lambda: self.pause_btn.config(state=tk.DISABLED))
@@ -1975,10 +1985,21 @@ class ScannerGUI:
         
         if self.is_scanning:
             return
-        
+
+        # Geometry is fixed for the whole scan: parse it once here on the Tk thread
+        # instead of reading the entries from the scan thread every revolution
+        try:
+            self._scan_geometry = (float(self.center_distance_var.get()), float(self.disk_radius_var.get()))
+        except ValueError:
+            messagebox.showerror("Error", "Invalid center distance or disk radius")
+            return
+
         self.is_scanning = True
         self.scan_paused = False
-        self.scan_data = []
+        self._scan_n = 0
+        self._point_rgba_range = None
+        self._reset_preview_cache()
+        self._rev_n = 0
         self.current_layer = 0
         
         self.scan_up_btn.config(state=tk.DISABLED)
@@ -2013,7 +2034,11 @@ class ScannerGUI:
             self.log_info("Scan resumed")
 
     def clear_data(self):
-        self.scan_data = []
+        self._scan_n = 0
+        self._point_rgba_range = None
+        self._reset_preview_cache()
+        self._rev_n = 0
+        self._viz_dirty = True
         self.log_info("Data cleared")
 
     def move_to_top(self):
@@ -2025,258 +2050,313 @@ class ScannerGUI:
     def send_config(self):
         self.log_info("Send config not implemented")
 
+    def _post_ui(self, key, update):
+        """Queue a widget update from a worker thread; a newer update with the same key replaces it"""
+        self._ui_pending[key] = update
+
+    def _drain_ui(self):
+        """Apply queued widget updates on the Tk main thread, at most every 50ms"""
+        while self._ui_pending:
+            _, update = self._ui_pending.popitem()
+            update()
+        if self._z_test_pending and self._test_tab_active:
+            # All queued Z test lines in one insert and one scroll
+            lines = []
+            while self._z_test_pending:
+                lines.append(self._z_test_pending.popleft())
+            self.z_test_results_text.insert(tk.END, "".join(lines))
+            self.z_test_results_text.see(tk.END)
+        self.root.after(50, self._drain_ui)
+
+    def _viz_tick(self):
+        """Redraw the 3D view if new scan data arrived since the last tick"""
+        if self._viz_dirty:
+            self._viz_dirty = False
+            self.update_visualization()
+        self.root.after(200, self._viz_tick)
+
+    def _on_viz_draw(self, event):
+        """After a full redraw (resize, rotate, new limits): save the background, add the scan artists"""
+        if event.canvas is not self.canvas or self.canvas.is_saving():
+            return  # savefig draws animated artists itself
+        self._viz_bg = self.canvas.copy_from_bbox(self.fig.bbox)
+        self._draw_viz_artists()
+
+    def _draw_viz_artists(self):
+        """Draw the animated title, mesh and point cloud over the current canvas contents"""
+        artists = [self.ax.title] + self._viz_artists
+        if self._viz_scatter is not None:
+            artists.append(self._viz_scatter)
+        for artist in artists:
+            if artist.get_visible():
+                if hasattr(artist, 'do_3d_projection'):
+                    artist.do_3d_projection()  # Project with the current view before drawing
+                self.ax.draw_artist(artist)
+
+    def _point_colors(self, z_coords, min_z, max_z):
+        """Viridis colors for the scan points, mapping only newly added points while the z range holds"""
+        cached = len(self._point_rgba)
+        if self._point_rgba_range != (min_z, max_z) or cached > len(z_coords):
+            # Range changed (new layer) or data was cleared: remap everything
+            self._point_rgba = colormaps['viridis']((z_coords - min_z) / (max_z - min_z))
+            self._point_rgba_range = (min_z, max_z)
+        elif cached < len(z_coords):
+            tail = colormaps['viridis']((z_coords[cached:] - min_z) / (max_z - min_z))
+            self._point_rgba = np.concatenate([self._point_rgba, tail])
+        return self._point_rgba
+
+    def _reset_preview_cache(self):
+        """Forget the preview's voxel-downsampled points and mesh cache (new scan or cleared data)"""
+        self._viz_voxels = set()  # Occupied voxel keys (ix, iy, iz)
+        self._viz_idx = np.empty(0, dtype=np.intp)  # Scan rows drawn in the preview, one per voxel
+        self._viz_seen = 0  # Scan rows already assigned to a voxel
+        self._viz_layers = []  # Preview mesh: scan points grouped by layer (see _preview_layers)
+        self._viz_layer_keys = np.empty(0, dtype=np.int32)
+        self._viz_layers_n = 0  # Scan rows included in _viz_layers
+        self._viz_pair_tris = {}  # (key1, key2, count1, count2) -> side triangles of a layer pair
+
+    def _preview_indices(self, pts):
+        """Rows of pts to draw: the first point to land in each PREVIEW_VOXEL_MM voxel
+
+        Only rows added since the last call are binned, so the cost per redraw follows
+        the new data rather than the whole cloud.
+        """
+        if self._viz_seen > len(pts):
+            self._reset_preview_cache()  # Data was cleared behind our back
+        if self._viz_seen < len(pts):
+            start = self._viz_seen
+            keys = np.floor(pts[start:, :3] / PREVIEW_VOXEL_MM).astype(np.int32)
+            _, first = np.unique(keys, axis=0, return_index=True)
+            first.sort()
+            new_rows = []
+            for i, key in zip(first.tolist(), map(tuple, keys[first].tolist())):
+                if key not in self._viz_voxels:
+                    self._viz_voxels.add(key)
+                    new_rows.append(start + i)
+            if new_rows:
+                self._viz_idx = np.concatenate([self._viz_idx, np.asarray(new_rows, dtype=np.intp)])
+            self._viz_seen = len(pts)
+        return self._viz_idx
+
+    def _preview_layers(self, pts):
+        """Scan points grouped by layer (height rounded to 0.1mm) as a list of arrays sorted
+        by angle, and the layer keys (height × 10) in ascending order
+
+        Scans add points at or above the top layer, so only the top layer and the new rows
+        are regrouped; anything else (points added below, cleared data) regroups everything.
+        """
+        n = self._viz_layers_n
+        if 0 < n <= len(pts):
+            new_keys = np.round(pts[n:, 4] * 10).astype(np.int32)
+            if len(new_keys) == 0 or new_keys.min() >= self._viz_layer_keys[-1]:
+                top_layers, top_keys = self._group_layers(np.concatenate([self._viz_layers[-1], pts[n:]]))
+                self._viz_layers = self._viz_layers[:-1] + top_layers
+                self._viz_layer_keys = np.concatenate([self._viz_layer_keys[:-1], top_keys])
+                self._viz_layers_n = len(pts)
+                return self._viz_layers, self._viz_layer_keys
+        self._viz_layers, self._viz_layer_keys = self._group_layers(pts)
+        self._viz_layers_n = len(pts)
+        return self._viz_layers, self._viz_layer_keys
+
+    @staticmethod
+    def _group_layers(pts):
+        """Split rows into layers with one sort keyed on (layer, angle)"""
+        height_keys = np.round(pts[:, 4] * 10).astype(np.int32)
+        order = np.lexsort((pts[:, 3], height_keys))
+        sorted_keys = height_keys[order]
+        boundaries = np.flatnonzero(np.diff(sorted_keys)) + 1
+        return np.split(pts[order], boundaries), sorted_keys[np.r_[0, boundaries]]
+
+    @staticmethod
+    def _layer_pair_triangles(layer1_points, layer2_points):
+        """Side triangles joining two adjacent layers (preview mesh), as an (M, 3, 3) array"""
+        # Step 4: Create triangulation between two layers
+        # For each point in layer1, take the layer2 point closest in angle,
+        # then build a quad with the next point's match
+        closest_j, min_angle_diff = _closest_angle(layer1_points[:, 3], layer2_points[:, 3])
+
+        # Quad corners: p1/p1_next in layer1, their matches p2/p2_next in layer2
+        next_i = np.roll(np.arange(len(layer1_points)), -1)
+        p1 = layer1_points[:, :3]
+        p2 = layer2_points[closest_j, :3]
+        p1_next = p1[next_i]
+        p2_next = p2[next_i]
+
+        # Both ends must match within 15 degrees, and no edge may span more
+        # than 50mm (prevents connecting distant points)
+        keep = (min_angle_diff < 15) & (min_angle_diff[next_i] < 15)
+        keep &= np.linalg.norm(p2 - p1, axis=1) < 50
+        keep &= np.linalg.norm(p1_next - p1, axis=1) < 50
+        keep &= np.linalg.norm(p2_next - p2, axis=1) < 50
+
+        # Two triangles per quad: (p1, p2, p1_next) and (p2, p2_next, p1_next)
+        quads = np.stack([np.stack([p1, p2, p1_next], axis=1),
+                          np.stack([p2, p2_next, p1_next], axis=1)], axis=1)
+        triangles = quads[keep].reshape(-1, 3, 3)
+
+        # Only draw triangles with non-zero area
+        normal = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+        triangles = triangles[np.linalg.norm(normal, axis=1) > 0.01]
+
+        return triangles
+
     def update_visualization(self):
         """Update 3D visualization with scan data - improved surface mesh + point cloud"""
         try:
-            self.ax.clear()
-
-            if len(self.scan_data) > 0:
+            # Drop the previous mesh; the axes and the point cloud artist are kept
+            for artist in self._viz_artists:
+                artist.remove()
+            self._viz_artists = []
+
+            # Snapshot: the scan thread may keep appending while we draw
+            pts = self.scan_data
+            if len(pts) > 0:
                 # Extract x, y, z coordinates
-                x_coords = np.array([p[0] for p in self.scan_data])
-                y_coords = np.array([p[1] for p in self.scan_data])
-                z_coords = np.array([p[2] for p in self.scan_data])
+                x_coords = pts[:, 0]
+                y_coords = pts[:, 1]
+                z_coords = pts[:, 2]
 
                 # ============================================
                 # IMPROVED MESH GENERATION
                 # ============================================
                 try:
-                    if len(self.scan_data) > 0 and len(self.scan_data[0]) >= 5:
-                        print(f"\n[MESH] Starting mesh generation with {len(self.scan_data)} points")
-
-                        # Step 1: Group points by layer (height)
-                        layer_groups = {}  # height -> list of (x, y, z, angle, index)
-
-                        for idx, point_data in enumerate(self.scan_data):
-                            if len(point_data) >= 5:
-                                x, y, z, angle, height = point_data[:5]
-                                # Round height to 0.1mm precision for grouping
-                                height_key = round(height, 1)
-                                if height_key not in layer_groups:
-                                    layer_groups[height_key] = []
-                                layer_groups[height_key].append((x, y, z, angle, idx))
+                    if len(pts) > 0:
+                        # Step 1: Group points by layer (height rounded to 0.1mm), each sorted by angle
+                        layers, layer_keys = self._preview_layers(pts)
 
-                        print(f"[MESH] Found {len(layer_groups)} layers")
-
-                        # Step 2: Sort layers by height
-                        sorted_heights = sorted(layer_groups.keys())
+                        # Step 2: Layer heights, ascending
+                        sorted_heights = layer_keys / 10.0
 
                         # Step 3: Create mesh between adjacent layers
-                        total_triangles = 0
-
-                        for layer_idx in range(len(sorted_heights) - 1):
-                            height1 = sorted_heights[layer_idx]
-                            height2 = sorted_heights[layer_idx + 1]
-
-                            # Get points from both layers, sorted by angle
-                            layer1_points = sorted(layer_groups[height1], key=lambda p: p[3])  # Sort by angle
-                            layer2_points = sorted(layer_groups[height2], key=lambda p: p[3])  # Sort by angle
-
-                            print(
-                                f"[MESH] Layer {height1:.1f}mm ({len(layer1_points)} pts) <-> {height2:.1f}mm ({len(layer2_points)} pts)")
-
-                            # Step 4: Create triangulation between two layers
-                            # Strategy: For each point in layer1, find closest point in layer2
-                            # Then create triangles to connect them
-
-                            triangles_in_layer = 0
-
-                            # Method: Match points by angle proximity
-                            for i in range(len(layer1_points)):
-                                x1, y1, z1, angle1, idx1 = layer1_points[i]
-
-                                # Find closest point in layer2 by angle
-                                min_angle_diff = 360
-                                closest_j = -1
-                                for j in range(len(layer2_points)):
-                                    x2, y2, z2, angle2, idx2 = layer2_points[j]
-                                    angle_diff = abs(angle2 - angle1)
-                                    if angle_diff > 180:
-                                        angle_diff = 360 - angle_diff
-
-                                    if angle_diff < min_angle_diff:
-                                        min_angle_diff = angle_diff
-                                        closest_j = j
-
-                                # If found a close match (within 15 degrees)
-                                if closest_j >= 0 and min_angle_diff < 15:
-                                    x2, y2, z2, angle2, idx2 = layer2_points[closest_j]
-
-                                    # Also get next point in layer1 (for quad)
-                                    next_i = (i + 1) % len(layer1_points)
-                                    x1_next, y1_next, z1_next, angle1_next, idx1_next = layer1_points[next_i]
-
-                                    # Find matching point in layer2 for next point
-                                    min_angle_diff_next = 360
-                                    closest_j_next = -1
-                                    for j in range(len(layer2_points)):
-                                        x2_j, y2_j, z2_j, angle2_j, idx2_j = layer2_points[j]
-                                        angle_diff = abs(angle2_j - angle1_next)
-                                        if angle_diff > 180:
-                                            angle_diff = 360 - angle_diff
-
-                                        if angle_diff < min_angle_diff_next:
-                                            min_angle_diff_next = angle_diff
-                                            closest_j_next = j
-
-                                    # If both matches found, create quad (2 triangles)
-                                    if closest_j_next >= 0 and min_angle_diff_next < 15:
-                                        x2_next, y2_next, z2_next, angle2_next, idx2_next = layer2_points[
-                                            closest_j_next]
-
-                                        # Check if points are not too far apart (prevent connecting distant points)
-                                        # Maximum distance threshold: 50mm
-                                        dist1 = np.sqrt((x2 - x1) ** 2 + (y2 - y1) ** 2 + (z2 - z1) ** 2)
-                                        dist2 = np.sqrt((x1_next - x1) ** 2 + (y1_next - y1) ** 2 + (z1_next - z1) ** 2)
-                                        dist3 = np.sqrt((x2_next - x2) ** 2 + (y2_next - y2) ** 2 + (z2_next - z2) ** 2)
-
-                                        if dist1 < 50 and dist2 < 50 and dist3 < 50:
-                                            # Create two triangles to form a quad
-                                            # Triangle 1: (p1_L1, p1_L2, p2_L1)
-                                            triangle1 = np.array([[x1, y1, z1],
-                                                                  [x2, y2, z2],
-                                                                  [x1_next, y1_next, z1_next]])
-
-                                            # Triangle 2: (p1_L2, p2_L2, p2_L1)
-                                            triangle2 = np.array([[x2, y2, z2],
-                                                                  [x2_next, y2_next, z2_next],
-                                                                  [x1_next, y1_next, z1_next]])
-
-                                            # Draw triangles
-                                            for triangle in [triangle1, triangle2]:
-                                                # Calculate normal vector to check if triangle is valid
-                                                v1 = triangle[1] - triangle[0]
-                                                v2 = triangle[2] - triangle[0]
-                                                normal = np.cross(v1, v2)
-
-                                                # Only draw if triangle has non-zero area
-                                                if np.linalg.norm(normal) > 0.01:
-                                                    poly = Poly3DCollection([triangle],
-                                                                            alpha=0.6,
-                                                                            facecolor='cyan',
-                                                                            edgecolor='blue',
-                                                                            linewidths=0.5)
-                                                    self.ax.add_collection3d(poly)
-                                                    triangles_in_layer += 1
-
-                            print(f"[MESH] Created {triangles_in_layer} triangles between layers")
-                            total_triangles += triangles_in_layer
-
-                        print(f"[MESH] Total triangles created: {total_triangles}")
+                        # Skip pairs with a gap (> 3 layer heights, using the median spacing)
+                        # or a layer too sparse to form a ring
+                        counts = np.array([len(layer) for layer in layers])
+                        gaps = np.diff(sorted_heights)
+                        layer_height = np.median(gaps) if len(gaps) else 0.0
+                        pair_ok = (gaps < 3 * layer_height) & (np.minimum(counts[:-1], counts[1:]) >= 3)
+
+                        # Triangles are collected here and drawn as one collection at the end.
+                        # A pair's triangles depend only on its two layers; points are only ever
+                        # appended, so a pair whose layers kept their size is reused as is
+                        side_tris = []
+                        pair_cache = {}
+
+                        for layer_idx in np.flatnonzero(pair_ok):
+                            key = (layer_keys[layer_idx], layer_keys[layer_idx + 1],
+                                   counts[layer_idx], counts[layer_idx + 1])
+                            triangles = self._viz_pair_tris.get(key)
+                            if triangles is None:
+                                triangles = self._layer_pair_triangles(layers[layer_idx], layers[layer_idx + 1])
+                            pair_cache[key] = triangles
+                            side_tris.append(triangles)
+                        self._viz_pair_tris = pair_cache
+
+                        side_tris = np.concatenate(side_tris) if side_tris else np.empty((0, 3, 3))
 
                         # Step 5: Add top and bottom caps (optional)
-                        # Top cap: connect all points in top layer
-                        if len(sorted_heights) >= 1:
-                            # Bottom cap
-                            bottom_layer = sorted(layer_groups[sorted_heights[0]], key=lambda p: p[3])
-                            if len(bottom_layer) >= 3:
-                                # Create fan triangulation from center
-                                center_x = np.mean([p[0] for p in bottom_layer])
-                                center_y = np.mean([p[1] for p in bottom_layer])
-                                center_z = sorted_heights[0]
-
-                                for i in range(len(bottom_layer)):
-                                    x1, y1, z1, _, _ = bottom_layer[i]
-                                    next_i = (i + 1) % len(bottom_layer)
-                                    x2, y2, z2, _, _ = bottom_layer[next_i]
-
-                                    triangle = np.array([[center_x, center_y, center_z],
-                                                         [x1, y1, z1],
-                                                         [x2, y2, z2]])
-
-                                    poly = Poly3DCollection([triangle],
-                                                            alpha=0.7,
-                                                            facecolor='lightgreen',
-                                                            edgecolor='green',
-                                                            linewidths=0.5)
-                                    self.ax.add_collection3d(poly)
-
-                            # Top cap
-                            top_layer = sorted(layer_groups[sorted_heights[-1]], key=lambda p: p[3])
-                            if len(top_layer) >= 3:
-                                center_x = np.mean([p[0] for p in top_layer])
-                                center_y = np.mean([p[1] for p in top_layer])
-                                center_z = sorted_heights[-1]
-
-                                for i in range(len(top_layer)):
-                                    x1, y1, z1, _, _ = top_layer[i]
-                                    next_i = (i + 1) % len(top_layer)
-                                    x2, y2, z2, _, _ = top_layer[next_i]
-
-                                    triangle = np.array([[center_x, center_y, center_z],
-                                                         [x1, y1, z1],
-                                                         [x2, y2, z2]])
-
-                                    poly = Poly3DCollection([triangle],
-                                                            alpha=0.7,
-                                                            facecolor='lightcoral',
-                                                            edgecolor='red',
-                                                            linewidths=0.5)
-                                    self.ax.add_collection3d(poly)
+                        # Fan triangulation from the layer centroid to each pair of neighbouring points
+                        def cap_triangles(layer, center_z):
+                            if len(layer) < 3:
+                                return np.empty((0, 3, 3))
+                            center = np.array([layer[:, 0].mean(), layer[:, 1].mean(), center_z])
+                            ring = layer[:, :3]
+                            return np.stack([np.broadcast_to(center, ring.shape), ring,
+                                             np.roll(ring, -1, axis=0)], axis=1)
+
+                        bottom_tris = cap_triangles(layers[0], sorted_heights[0])
+                        top_tris = cap_triangles(layers[-1], sorted_heights[-1])
+
+                        # Step 6: Draw sides and caps as a single collection
+                        # (alpha is folded into the per-face RGBA colors)
+                        triangles = np.concatenate([side_tris, bottom_tris, top_tris])
+                        if len(triangles):
+                            # Per-face RGBA as (M, 4) arrays, which Matplotlib takes without
+                            # converting a list of M color tuples one by one
+                            part_sizes = [len(side_tris), len(bottom_tris), len(top_tris)]
+                            face_colors = np.repeat([to_rgba('cyan', 0.6), to_rgba('lightgreen', 0.7),
+                                                     to_rgba('lightcoral', 0.7)], part_sizes, axis=0)
+                            edge_colors = np.repeat([to_rgba('blue', 0.6), to_rgba('green', 0.7),
+                                                     to_rgba('red', 0.7)], part_sizes, axis=0)
+                            poly = Poly3DCollection(triangles,
+                                                    facecolors=face_colors,
+                                                    edgecolors=edge_colors,
+                                                    linewidths=0.5,
+                                                    animated=True)
+                            self.ax.add_collection3d(poly)
+                            self._viz_artists.append(poly)
 
                 except Exception as e:
                     print(f"[MESH] Error creating mesh: {e}")
-                    import traceback
                     traceback.print_exc()
 
+                # Bounds of all three axes in one pass
+                min_xyz = pts[:, :3].min(axis=0)
+                max_xyz = pts[:, :3].max(axis=0)
+
                 # Always draw point cloud on top for reference
                 if len(z_coords) > 0:
-                    min_z = min(z_coords)
-                    max_z = max(z_coords)
+                    # mplot3d renders every marker on the CPU: draw one point per voxel,
+                    # and thin that further if the object is large enough to exceed the cap
+                    idx = self._preview_indices(pts)
+                    idx = idx[::-(-len(idx) // PREVIEW_MAX_POINTS)]
+                    xs, ys, zs = x_coords[idx], y_coords[idx], z_coords[idx]
+                    min_z = min_xyz[2]
+                    max_z = max_xyz[2]
                     if max_z > min_z:
-                        z_normalized = [(z - min_z) / (max_z - min_z) for z in z_coords]
-                        self.ax.scatter(x_coords, y_coords, z_coords,
-                                        c=z_normalized, cmap='viridis',
-                                        s=8, alpha=0.8, edgecolors='black', linewidths=0.3)
+                        colors = self._point_colors(z_coords, min_z, max_z)[idx]
                     else:
-                        self.ax.scatter(x_coords, y_coords, z_coords,
-                                        c='blue', s=8, alpha=0.8, edgecolors='black', linewidths=0.3)
+                        colors = 'blue'
+                    if self._viz_scatter is None:
+                        self._viz_scatter = self.ax.scatter(xs, ys, zs, c=colors, s=8, alpha=0.8,
+                                                            edgecolors='black', linewidths=0.3, zorder=2,
+                                                            animated=True)
+                    else:
+                        # Move the existing markers instead of building a new collection
+                        self._viz_scatter._offsets3d = (xs, ys, zs)
+                        self._viz_scatter.set_facecolor(colors)
+                        self._viz_scatter.set_visible(True)
 
-                # Set labels
-                self.ax.set_xlabel('X (mm)', fontsize=10)
-                self.ax.set_ylabel('Y (mm)', fontsize=10)
-                self.ax.set_zlabel('Z (mm)', fontsize=10)
-                self.ax.set_title(f'3D Scan Mesh - {len(self.scan_data)} points', fontsize=11, fontweight='bold')
+                # Text and weight only: set_title would also reset the title position laid out by
+                # the last full redraw, and blitted updates don't lay it out again
+                self.ax.title.set_text(f'3D Scan Mesh - {len(pts)} points')
+                self.ax.title.set_fontweight('bold')
 
                 # Calculate bounds with padding
-                if len(x_coords) > 0 and len(y_coords) > 0 and len(z_coords) > 0:
-                    x_range = max(x_coords) - min(x_coords)
-                    y_range = max(y_coords) - min(y_coords)
-                    z_range = max(z_coords) - min(z_coords)
-
-                    max_range = max(x_range, y_range, z_range) or 1
-                    padding = max_range * 0.1
+                x_range, y_range, z_range = max_xyz - min_xyz
 
-                    mid_x = (max(x_coords) + min(x_coords)) / 2
-                    mid_y = (max(y_coords) + min(y_coords)) / 2
-                    mid_z = (max(z_coords) + min(z_coords)) / 2
+                max_range = float(max(x_range, y_range, z_range)) or 1
+                padding = max_range * 0.1
 
-                    self.ax.set_xlim(mid_x - max_range / 2 - padding, mid_x + max_range / 2 + padding)
-                    self.ax.set_ylim(mid_y - max_range / 2 - padding, mid_y + max_range / 2 + padding)
-                    self.ax.set_zlim(mid_z - max_range / 2 - padding, mid_z + max_range / 2 + padding)
-
-                    try:
-                        self.ax.set_box_aspect([1, 1, 1])
-                    except:
-                        pass
-                else:
-                    self.ax.set_xlim(-10, 10)
-                    self.ax.set_ylim(-10, 10)
-                    self.ax.set_zlim(0, 20)
+                mid_x, mid_y, mid_z = (max_xyz + min_xyz) / 2
+                half = max_range / 2 + padding
+                limits = ((mid_x - half, mid_x + half),
+                          (mid_y - half, mid_y + half),
+                          (mid_z - half, mid_z + half))
             else:
-                self.ax.set_xlabel('X (mm)', fontsize=10)
-                self.ax.set_ylabel('Y (mm)', fontsize=10)
-                self.ax.set_zlabel('Z (mm)', fontsize=10)
-                self.ax.set_title('3D Scan Mesh - No data', fontsize=11)
-                self.ax.set_xlim(-10, 10)
-                self.ax.set_ylim(-10, 10)
-                self.ax.set_zlim(0, 20)
-
-            self.canvas.draw()
-            self.canvas.flush_events()
+                if self._viz_scatter is not None:
+                    self._viz_scatter.set_visible(False)
+                self.ax.title.set_text('3D Scan Mesh - No data')
+                self.ax.title.set_fontweight('normal')
+                limits = ((-10, 10), (-10, 10), (0, 20))
+
+            # Only touch the limits when the bounds changed (keeps tick layout cached)
+            if limits != self._viz_limits:
+                self._viz_limits = limits
+                self.ax.set_xlim(*limits[0])
+                self.ax.set_ylim(*limits[1])
+                self.ax.set_zlim(*limits[2])
+                self._viz_bg = None  # Axes changed: the saved background is stale
+
+            if self._viz_bg is None:
+                # Full redraw; _on_viz_draw saves the new background and adds the scan artists
+                self.canvas.draw_idle()
+            else:
+                self.canvas.restore_region(self._viz_bg)
+                self._draw_viz_artists()
+                self.canvas.blit(self.fig.bbox)
 
         except Exception as e:
             self.log_info(f"Visualization error: {e}")
-            import traceback
             traceback.print_exc()
 
     def export_stl(self):
@@ -2301,7 +2381,6 @@ class ScannerGUI:
             messagebox.showinfo("Success", f"STL file exported successfully!\n{len(faces)} triangles")
         except Exception as e:
             self.log_info(f"STL export error: {e}")
-            import traceback
             traceback.print_exc()
             messagebox.showerror("Error", f"Failed to export STL: {str(e)}")
 
@@ -2327,7 +2406,6 @@ class ScannerGUI:
             messagebox.showinfo("Success", f"LS-DYNA .k file exported successfully!\n{len(faces)} triangles")
         except Exception as e:
             self.log_info(f"LS-DYNA .k export error: {e}")
-            import traceback
             traceback.print_exc()
             messagebox.showerror("Error", f"Failed to export .k: {str(e)}")
     
@@ -2353,7 +2431,6 @@ class ScannerGUI:
             messagebox.showinfo("Success", f"STEP file exported successfully!\n{len(faces)} triangles")
         except Exception as e:
             self.log_info(f"STEP export error: {e}")
-            import traceback
             traceback.print_exc()
             messagebox.showerror("Error", f"Failed to export STEP: {str(e)}")
     
@@ -2362,150 +2439,106 @@ class ScannerGUI:
         if len(self.scan_data) < 3:
             raise ValueError("Not enough points to generate mesh")
         
-        # Group points by layer (height)
-        layer_groups = {}
-        for idx, point_data in enumerate(self.scan_data):
-            if len(point_data) >= 5:
-                x, y, z, angle, height = point_data[:5]
-                height_key = round(height, 1)
-                if height_key not in layer_groups:
-                    layer_groups[height_key] = []
-                layer_groups[height_key].append((x, y, z, angle, idx))
-        
-        sorted_heights = sorted(layer_groups.keys())
-        vertices = []
+        # Group points by layer (height rounded to 0.1mm) straight from the buffer columns:
+        # one sort keyed on (layer, angle), split at the layer boundaries
+        pts = self.scan_data
+        height_keys = np.round(pts[:, 4] * 10).astype(np.int32)
+        order = np.lexsort((pts[:, 3], height_keys))
+        sorted_keys = height_keys[order]
+        boundaries = np.flatnonzero(np.diff(sorted_keys)) + 1
+        sorted_heights = (sorted_keys[np.r_[0, boundaries]] / 10.0).tolist()
+        layers = np.split(pts[order, :4], boundaries)  # each sorted by angle
+
+        # Vertex references in creation order; faces index into this list until the
+        # duplicates are merged at the end
+        refs = []
         faces = []
-        vertex_index_map = {}  # Map (x, y, z) -> vertex index
-        
-        def get_vertex_index(x, y, z):
-            """Get or create vertex index"""
-            key = (round(x, 3), round(y, 3), round(z, 3))
-            if key not in vertex_index_map:
-                vertex_index_map[key] = len(vertices)
-                vertices.append([x, y, z])
-            return vertex_index_map[key]
-        
+        n_refs = 0
+
         # Create mesh between adjacent layers
         for layer_idx in range(len(sorted_heights) - 1):
-            height1 = sorted_heights[layer_idx]
-            height2 = sorted_heights[layer_idx + 1]
-            
-            layer1_points = sorted(layer_groups[height1], key=lambda p: p[3])
-            layer2_points = sorted(layer_groups[height2], key=lambda p: p[3])
-            
-            # Connect points between layers
-            for i in range(len(layer1_points)):
-                x1, y1, z1, angle1, idx1 = layer1_points[i]
-                next_i = (i + 1) % len(layer1_points)
-                x1_next, y1_next, z1_next, angle1_next, idx1_next = layer1_points[next_i]
-                
-                # Find closest points in layer2
-                min_angle_diff = 360
-                closest_j = -1
-                for j in range(len(layer2_points)):
-                    x2, y2, z2, angle2, idx2 = layer2_points[j]
-                    angle_diff = abs(angle2 - angle1)
-                    if angle_diff > 180:
-                        angle_diff = 360 - angle_diff
-                    if angle_diff < min_angle_diff:
-                        min_angle_diff = angle_diff
-                        closest_j = j
-                
-                if closest_j >= 0 and min_angle_diff < 15:
-                    x2, y2, z2, angle2, idx2 = layer2_points[closest_j]
-                    next_j = (closest_j + 1) % len(layer2_points)
-                    x2_next, y2_next, z2_next, angle2_next, idx2_next = layer2_points[next_j]
-                    
-                    # Check distances to prevent connecting distant points
-                    dist1 = np.sqrt((x2 - x1)**2 + (y2 - y1)**2 + (z2 - z1)**2)
-                    dist2 = np.sqrt((x1_next - x1)**2 + (y1_next - y1)**2 + (z1_next - z1)**2)
-                    dist3 = np.sqrt((x2_next - x2)**2 + (y2_next - y2)**2 + (z2_next - z2)**2)
-                    
-                    if dist1 < 50 and dist2 < 50 and dist3 < 50:
-                        # Create quad as two triangles
-                        v1 = get_vertex_index(x1, y1, z1)
-                        v2 = get_vertex_index(x2, y2, z2)
-                        v3 = get_vertex_index(x1_next, y1_next, z1_next)
-                        v4 = get_vertex_index(x2_next, y2_next, z2_next)
-                        
-                        # Triangle 1: v1, v2, v3
-                        faces.append([v1, v2, v3])
-                        # Triangle 2: v2, v4, v3
-                        faces.append([v2, v4, v3])
-        
-        # Add top and bottom caps
-        if len(sorted_heights) >= 1:
-            # Bottom cap
-            bottom_layer = sorted(layer_groups[sorted_heights[0]], key=lambda p: p[3])
-            if len(bottom_layer) >= 3:
-                center_x = np.mean([p[0] for p in bottom_layer])
-                center_y = np.mean([p[1] for p in bottom_layer])
-                center_z = sorted_heights[0]
-                center_idx = get_vertex_index(center_x, center_y, center_z)
-                
-                for i in range(len(bottom_layer)):
-                    x1, y1, z1, _, _ = bottom_layer[i]
-                    next_i = (i + 1) % len(bottom_layer)
-                    x2, y2, z2, _, _ = bottom_layer[next_i]
-                    v1 = get_vertex_index(x1, y1, z1)
-                    v2 = get_vertex_index(x2, y2, z2)
-                    faces.append([center_idx, v1, v2])
-            
-            # Top cap
-            top_layer = sorted(layer_groups[sorted_heights[-1]], key=lambda p: p[3])
-            if len(top_layer) >= 3:
-                center_x = np.mean([p[0] for p in top_layer])
-                center_y = np.mean([p[1] for p in top_layer])
-                center_z = sorted_heights[-1]
-                center_idx = get_vertex_index(center_x, center_y, center_z)
-                
-                for i in range(len(top_layer)):
-                    x1, y1, z1, _, _ = top_layer[i]
-                    next_i = (i + 1) % len(top_layer)
-                    x2, y2, z2, _, _ = top_layer[next_i]
-                    v1 = get_vertex_index(x1, y1, z1)
-                    v2 = get_vertex_index(x2, y2, z2)
-                    faces.append([center_idx, v2, v1])  # Reverse order for top
-        
-        return np.array(vertices), np.array(faces)
+            layer1_points = layers[layer_idx]
+            layer2_points = layers[layer_idx + 1]
+
+            # For each point in layer1, the layer2 point closest in angle
+            closest_j, min_angle_diff = _closest_angle(layer1_points[:, 3], layer2_points[:, 3])
+
+            # Quad corners: p1/p1_next in layer1, the match p2 and the point after it in layer2
+            p1 = layer1_points[:, :3]
+            p1_next = np.roll(p1, -1, axis=0)
+            p2 = layer2_points[closest_j, :3]
+            p2_next = layer2_points[(closest_j + 1) % len(layer2_points), :3]
+
+            # Check distances to prevent connecting distant points
+            keep = min_angle_diff < 15
+            keep &= np.linalg.norm(p2 - p1, axis=1) < 50
+            keep &= np.linalg.norm(p1_next - p1, axis=1) < 50
+            keep &= np.linalg.norm(p2_next - p2, axis=1) < 50
+
+            # Each quad adds v1, v2, v3, v4 and two triangles: (v1, v2, v3) and (v2, v4, v3)
+            quads = np.stack([p1, p2, p1_next, p2_next], axis=1)[keep].reshape(-1, 3)
+            base = n_refs + 4 * np.arange(np.count_nonzero(keep))[:, None]
+            refs.append(quads)
+            faces.append(np.concatenate([base + [0, 1, 2], base + [1, 3, 2]], axis=1).reshape(-1, 3))
+            n_refs += len(quads)
+
+        # Add top and bottom caps: fan from the layer centroid, pairs of neighbouring points
+        for layer, center_z, top in ((layers[0], sorted_heights[0], False),
+                                     (layers[-1], sorted_heights[-1], True)):
+            if len(layer) < 3:
+                continue
+            ring = layer[:, :3]
+            center = np.array([layer[:, 0].mean(), layer[:, 1].mean(), center_z], dtype=np.float32)
+            # Adds the center, then v1, v2 for every ring point
+            refs.append(np.vstack([center, np.stack([ring, np.roll(ring, -1, axis=0)], axis=1).reshape(-1, 3)]))
+            pair = n_refs + 1 + 2 * np.arange(len(ring))[:, None]
+            order_v = [1, 0] if top else [0, 1]  # Reverse order for top
+            faces.append(np.concatenate([np.full_like(pair, n_refs), pair + order_v], axis=1))
+            n_refs += 1 + 2 * len(ring)
+
+        refs = np.concatenate(refs) if refs else np.empty((0, 3), dtype=np.float32)
+        faces = np.concatenate(faces) if faces else np.empty((0, 3), dtype=np.intp)
+
+        # Merge vertices that match to 0.001mm, numbered in order of first use
+        keys = np.round(refs, 3) + 0.0  # + 0.0 folds -0.0 into 0.0
+        _, first, inverse = np.unique(keys, axis=0, return_index=True, return_inverse=True)
+        rank = np.empty(len(first), dtype=np.intp)
+        rank[np.argsort(first)] = np.arange(len(first))
+        vertices = refs[np.sort(first)]
+        faces = rank[inverse.reshape(-1)][faces]
+        return vertices, faces
     
-    def write_stl_file(self, filename, vertices, faces):
+    def write_stl_file(self, filename, vertices, faces, chunk=65536):
         """Write STL file in binary format"""
+        # Normals are computed in the vertices' own precision and only stored as float32
+        vertices = np.asarray(vertices)
+        faces = np.asarray(faces, dtype=np.intp).reshape(-1, 3)
+
         with open(filename, 'wb') as f:
             # Write header (80 bytes)
             header = b'3D Scanner STL File - Exported from Scanner GUI' + b'\x00' * 35
             f.write(header[:80])
             
             # Write number of facets
-            num_facets = len(faces)
-            f.write(np.uint32(num_facets).tobytes())
+            f.write(np.uint32(len(faces)).tobytes())
             
-            # Write facets
-            for face in faces:
-                v1 = vertices[face[0]]
-                v2 = vertices[face[1]]
-                v3 = vertices[face[2]]
-                
-                # Calculate normal
-                edge1 = np.array(v2) - np.array(v1)
-                edge2 = np.array(v3) - np.array(v1)
-                normal = np.cross(edge1, edge2)
-                norm = np.linalg.norm(normal)
-                if norm > 0:
-                    normal = normal / norm
-                else:
-                    normal = np.array([0.0, 0.0, 1.0])
-                
-                # Write normal (3 floats)
-                f.write(np.float32(normal).tobytes())
-                
-                # Write vertices (3 floats each)
-                f.write(np.float32(v1).tobytes())
-                f.write(np.float32(v2).tobytes())
-                f.write(np.float32(v3).tobytes())
-                
-                # Write attribute byte count (usually 0)
-                f.write(np.uint16(0).tobytes())
+            # Facets built in the binary STL record layout (50 bytes each), a chunk
+            # at a time so peak memory stays bounded on large meshes
+            for start in range(0, len(faces), chunk):
+                tris = vertices[faces[start:start + chunk]]
+                facets = np.zeros(len(tris), dtype=STL_FACET)
+                facets['v'] = tris
+
+                # Calculate normals; degenerate triangles get +Z
+                normal = np.cross(tris[:, 1] - tris[:, 0], tris[:, 2] - tris[:, 0])
+                # Length as a per-row dot product, like np.linalg.norm of a single vector
+                norm = np.sqrt((normal[:, None, :] @ normal[:, :, None]).ravel())
+                facets['n'] = [0.0, 0.0, 1.0]
+                valid = norm > 0
+                facets['n'][valid] = normal[valid] / norm[valid, None]
+
+                # Attribute byte count stays 0
+                facets.tofile(f)
     
     def write_obj_file(self, filename, vertices, faces):
         """Write OBJ file in text format"""
@@ -2638,7 +2671,8 @@ class ScannerGUI:
         now = datetime.now()
         timestamp = now.strftime("%H:%M:%S %m-%d-%Y")
         
-        with open(filename, 'w') as f:
+        # Large write buffer: the node and element cards are written in chunks (_write_rows)
+        with open(filename, 'w', buffering=1 << 20) as f:
             # Write HyperMesh header
             f.write(f"$$ HM_OUTPUT_DECK created {timestamp} by 3D Scanner GUI\n")
             f.write("$$ Ls-dyna Input Deck Generated by Scanner Export\n")
@@ -2688,9 +2722,9 @@ class ScannerGUI:
             
             # Write nodes
             f.write("*NODE\n")
-            for node_id, coords in enumerate(vertices, start=1):
-                # Format: ID (8 chars), X (16 chars), Y (16 chars), Z (16 chars)
-                f.write(f"{node_id:>8}{coords[0]:>16.6f}{coords[1]:>16.6f}{coords[2]:>16.6f}\n")
+            # Format: ID (8 chars), X (16 chars), Y (16 chars), Z (16 chars)
+            node_ids = np.arange(1, len(vertices) + 1)
+            _write_rows(f, np.column_stack((node_ids, vertices)), '%8d%16.6f%16.6f%16.6f')
             
             # Write material with HyperMesh comments
             f.write("*MAT_ELASTIC\n")
@@ -2715,14 +2749,11 @@ class ScannerGUI:
             # Write elements
             # Using ELEMENT_SHELL for triangular elements (4 nodes, with 3rd and 4th node same for triangle)
             f.write("*ELEMENT_SHELL\n")
-            for elem_id, face in enumerate(faces, start=1):
-                # For triangular shell: use 4-node format with last node = 3rd node
-                # Node IDs are 1-based (face indices + 1)
-                n1 = face[0] + 1
-                n2 = face[1] + 1
-                n3 = face[2] + 1
-                n4 = n3  # Duplicate last node for triangular element
-                f.write(f"{elem_id:>8}       1{n1:>8}{n2:>8}{n3:>8}{n4:>8}\n")
+            # For triangular shell: use 4-node format with last node = 3rd node
+            # Node IDs are 1-based (face indices + 1)
+            faces = np.asarray(faces, dtype=np.int64).reshape(-1, 3)
+            elem_ids = np.arange(1, len(faces) + 1)
+            _write_rows(f, np.column_stack((elem_ids, faces + 1, faces[:, 2] + 1)), '%8d       1%8d%8d%8d%8d')
             
             # End file
             f.write("*END\n")
@@ -2732,48 +2763,70 @@ class ScannerGUI:
         self.log_info(f"  Total elements: {len(faces)}")
 
     def get_cartesian_points(self):
-        return None
+        """(N, 3) float32 view of the scan points' x, y, z
+
+        Points are converted once, a revolution at a time, when they are stored, so this
+        is a slice of the scan buffer rather than a recomputation.
+        """
+        return self.scan_data[:, :3]
 
     def log_info(self, message):
-        """Log to info text widget (thread-safe)"""
+        """Log to info text widget (safe from any thread; shown by _flush_info_log)"""
         if hasattr(self, 'root') and hasattr(self, 'info_text'):
-            self.root.after(0, lambda msg=message: self._log_info_safe(msg))
+            self._info_log_pending.append(f"[{time.strftime('%H:%M:%S')}] {message}\n")
         else:
             print(f"[LOG] {message}")
 
-    def _log_info_safe(self, message):
-        """Thread-safe helper"""
-        try:
-            if hasattr(self, 'info_text'):
-                self.info_text.insert(tk.END, f"[{time.strftime('%H:%M:%S')}] {message}\n")
-                self.info_text.see(tk.END)
-        except Exception as e:
-            print(f"Error logging: {e}")
+    def _flush_info_log(self):
+        """Append queued info log lines in a single insert, keeping the last 1000 lines
+
+        The info log is on the Control tab; while the Test tab is showing, lines stay
+        queued (the queue keeps the same last 1000) and are inserted when it is left.
+        """
+        if self._info_log_pending and not self._test_tab_active:
+            lines = []
+            while self._info_log_pending:
+                lines.append(self._info_log_pending.popleft())
+            self.info_text.insert(tk.END, "".join(lines))
+            self._info_log_lines += len(lines)
+            if self._info_log_lines > 1000:
+                self.info_text.delete('1.0', f'{self._info_log_lines - 999}.0')
+                self._info_log_lines = 1000
+            self.info_text.see(tk.END)
+        self.root.after(200, self._flush_info_log)
 
     def log_serial_send(self, command):
-        """Log command sent"""
-        if hasattr(self, 'serial_log_text'):
-            timestamp = time.strftime('%H:%M:%S')
-            self.serial_log_text.insert(tk.END, f"[{timestamp}] → SEND: {command.strip()}\n")
-            self.serial_log_text.see(tk.END)
-            lines = int(self.serial_log_text.index('end-1c').split('.')[0])
-            if lines > 1000:
-                self.serial_log_text.delete('1.0', f'{lines-1000}.0')
+        """Log command sent (safe from any thread; shown by _flush_serial_log)"""
+        timestamp = time.strftime('%H:%M:%S')
+        self._serial_log_pending.append(f"[{timestamp}] → SEND: {command.strip()}\n")
 
     def log_serial_receive(self, response):
-        """Log response received"""
-        if hasattr(self, 'serial_log_text'):
-            timestamp = time.strftime('%H:%M:%S')
-            self.serial_log_text.insert(tk.END, f"[{timestamp}] ← RECV: {response.strip()}\n")
+        """Log response received (safe from any thread; shown by _flush_serial_log)"""
+        timestamp = time.strftime('%H:%M:%S')
+        self._serial_log_pending.append(f"[{timestamp}] ← RECV: {response.strip()}\n")
+
+    def _flush_serial_log(self):
+        """Append queued serial log lines in a single insert, keeping the last 1000 lines
+
+        Only while the Test tab (where the log is) is showing; otherwise lines stay queued.
+        """
+        if self._serial_log_pending and self._test_tab_active:
+            lines = []
+            while self._serial_log_pending:
+                lines.append(self._serial_log_pending.popleft())
+            self.serial_log_text.insert(tk.END, "".join(lines))
+            self._serial_log_lines += len(lines)
+            if self._serial_log_lines > 1000:
+                self.serial_log_text.delete('1.0', f'{self._serial_log_lines - 999}.0')
+                self._serial_log_lines = 1000
             self.serial_log_text.see(tk.END)
-            lines = int(self.serial_log_text.index('end-1c').split('.')[0])
-            if lines > 1000:
-                self.serial_log_text.delete('1.0', f'{lines-1000}.0')
+        self.root.after(200, self._flush_serial_log)
 
     def clear_serial_log(self):
         """Clear serial log"""
-        if hasattr(self, 'serial_log_text'):
-            self.serial_log_text.delete('1.0', tk.END)
+        self._serial_log_pending.clear()
+        self._serial_log_lines = 0
+        self.serial_log_text.delete('1.0', tk.END)
 
 def main():
     root = tk.Tk()
@@ -0,0 +1,8 @@
+"""
+Binary STL record layout shared by the STL writers
+"""
+
+import numpy as np
+
+# One binary STL facet: normal, three vertices, attribute byte count (little-endian, unpadded)
+STL_FACET = np.dtype([('n', '<f4', (3,)), ('v', '<f4', (3, 3)), ('attr', '<u2')])
@@ -6,6 +6,8 @@ import numpy as np
 from scipy.spatial import ConvexHull
 from scipy.interpolate import griddata
 
+from stl_format import STL_FACET
+
 def generate_stl_from_points(points, filename):
     """
     Generate STL file from point cloud
@@ -55,70 +57,50 @@ def create_grid_mesh(points, filename):
         fill_value=z_min
     )
     
-    # Create mesh from grid
-    vertices = []
-    faces = []
-    
-    for i in range(y_res - 1):
-        for j in range(x_res - 1):
-            # Create two triangles for each quad
-            v1 = [xi_grid[i, j], yi_grid[i, j], zi_grid[i, j]]
-            v2 = [xi_grid[i, j+1], yi_grid[i, j+1], zi_grid[i, j+1]]
-            v3 = [xi_grid[i+1, j], yi_grid[i+1, j], zi_grid[i+1, j]]
-            v4 = [xi_grid[i+1, j+1], yi_grid[i+1, j+1], zi_grid[i+1, j+1]]
-            
-            # Triangle 1
-            idx1 = len(vertices)
-            vertices.append(v1)
-            idx2 = len(vertices)
-            vertices.append(v2)
-            idx3 = len(vertices)
-            vertices.append(v3)
-            faces.append([idx1, idx2, idx3])
-            
-            # Triangle 2
-            idx4 = len(vertices)
-            vertices.append(v2)
-            idx5 = len(vertices)
-            vertices.append(v4)
-            idx6 = len(vertices)
-            vertices.append(v3)
-            faces.append([idx4, idx5, idx6])
-    
-    vertices = np.array(vertices)
-    write_stl_binary(filename, vertices, np.array(faces))
+    # Create mesh from grid: vertex (i, j) is row i * x_res + j of the vertex array
+    vertices = np.stack([xi_grid, yi_grid, zi_grid], axis=-1).reshape(-1, 3)
+
+    # Two triangles for each quad, (v1, v2, v3) and (v2, v4, v3), quads in row order
+    i, j = np.meshgrid(np.arange(y_res - 1), np.arange(x_res - 1), indexing='ij')
+    v1 = (i * x_res + j).ravel()
+    v2 = v1 + 1
+    v3 = v1 + x_res
+    v4 = v3 + 1
+    faces = np.stack([np.column_stack([v1, v2, v3]),
+                      np.column_stack([v2, v4, v3])], axis=1).reshape(-1, 3)
 
-def write_stl_binary(filename, vertices, faces):
+    write_stl_binary(filename, vertices, faces)
+
+def write_stl_binary(filename, vertices, faces, chunk=65536):
     """Write STL file in binary format"""
+    # Facets are built as STL_FACET records, chunk facets at a time so
+    # peak memory stays bounded for large meshes
+    faces = np.asarray(faces, dtype=np.intp).reshape(-1, 3)
+    vertices = np.asarray(vertices)
+    if not np.issubdtype(vertices.dtype, np.floating):
+        vertices = vertices.astype(np.float64)
+
     with open(filename, 'wb') as f:
         # Write header (80 bytes)
         header = b'3D Scanner STL File' + b'\x00' * 61
         f.write(header)
         
         # Write number of facets
-        num_facets = len(faces)
-        f.write(np.uint32(num_facets).tobytes())
+        f.write(np.uint32(len(faces)).tobytes())
         
         # Write facets
-        for face in faces:
-            # Get triangle vertices
-            v1 = vertices[face[0]]
-            v2 = vertices[face[1]]
-            v3 = vertices[face[2]]
-            
-            # Calculate normal
-            normal = calculate_normal(v1, v2, v3)
-            
-            # Write normal (3 floats)
-            f.write(np.float32(normal).tobytes())
-            
-            # Write vertices (3 floats each)
-            f.write(np.float32(v1).tobytes())
-            f.write(np.float32(v2).tobytes())
-            f.write(np.float32(v3).tobytes())
-            
-            # Write attribute byte count (usually 0)
-            f.write(np.uint16(0).tobytes())
+        for start in range(0, len(faces), chunk):
+            triangles = vertices[faces[start:start + chunk]]
+
+            # Unit normals, as calculate_normal computes them; degenerate facets keep a zero normal
+            normals = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+            norms = np.linalg.norm(normals, axis=1)
+            np.divide(normals, norms[:, None], out=normals, where=norms[:, None] > 0)
+
+            facets = np.zeros(len(triangles), dtype=STL_FACET)
+            facets['n'] = normals
+            facets['v'] = triangles
+            f.write(facets.tobytes())
 
 def calculate_normal(v1, v2, v3):
     """Calculate normal vector for triangle"""